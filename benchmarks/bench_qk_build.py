@@ -0,0 +1,189 @@
+"""
+Q_k Model Build Benchmark.
+
+Compares the model-build time of the original per-point builder (one LinExpr and
+one addConstr call per point) against the matrix-API builder in
+src/solvers/gurobi_qp.py, for a growing number of points. For sizes the Gurobi
+license can solve, it also checks that both models give the same w, xi, gamma
+and objective.
+
+It then times a center change of GurobiQkSession: one chgCoeff call per row
+(the original update) against the column replacement the session uses, with a
+full basis to carry over, next to a fresh matrix-API build.
+
+Usage:
+    python -m benchmarks.bench_qk_build
+"""
+
+import time
+
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+from sklearn.datasets import make_blobs
+
+from src.solvers import GurobiQkSession, build_qk_model, qk_blocks
+
+POINT_COUNTS = [100, 1000, 5000, 20000]
+N_FEATURES = 10
+SOLVE_LIMIT = 150  # Largest size solved for the equivalence check
+
+
+def build_qk_model_loop(A_indices, B_indices, A_full, B_full, center_a, C, lamb):
+    """
+    Reference builder: the original row-by-row construction of Q_k.
+    """
+    m_sub = len(A_indices)
+    p_sub = len(B_indices)
+    n_features = A_full.shape[1]
+
+    model = gp.Model("Q_k_loop")
+    model.setParam("OutputFlag", 0)
+
+    w = model.addVars(n_features, lb=-GRB.INFINITY, name="w")
+    xi = model.addVar(lb=0.0, name="xi")
+    gamma = model.addVar(lb=1.0, name="gamma")
+    y_slack = model.addVars(m_sub, lb=0.0, name="y")
+    z_slack = model.addVars(p_sub, lb=0.0, name="z")
+
+    for idx_enum, original_idx in enumerate(A_indices):
+        diff = A_full[original_idx] - center_a
+        term1 = gp.LinExpr()
+        term1.addTerms(diff, [w[j] for j in range(n_features)])
+        l1_norm = np.sum(np.abs(diff))
+        model.addConstr(term1 + l1_norm * xi - gamma + 1 <= y_slack[idx_enum])
+
+    for idx_enum, original_idx in enumerate(B_indices):
+        diff = B_full[original_idx] - center_a
+        term1 = gp.LinExpr()
+        term1.addTerms(diff, [w[j] for j in range(n_features)])
+        l1_norm = np.sum(np.abs(diff))
+        model.addConstr(-1 * term1 - l1_norm * xi + gamma + 1 <= z_slack[idx_enum])
+
+    w_sq = gp.quicksum(w[j] * w[j] for j in range(n_features))
+    obj = lamb * (w_sq + xi * xi + gamma * gamma)
+    obj += (1.0 / m_sub) * y_slack.sum()
+    if p_sub > 0:
+        obj += (C / p_sub) * z_slack.sum()
+    model.setObjective(obj, GRB.MINIMIZE)
+    model.update()
+
+    def extract():
+        return (
+            np.array([w[j].X for j in range(n_features)]),
+            xi.X,
+            gamma.X,
+            model.ObjVal,
+        )
+
+    return model, extract
+
+
+def _split(n_points, seed=0):
+    X, y = make_blobs(
+        n_samples=n_points, centers=2, n_features=N_FEATURES, random_state=seed
+    )
+    A_indices = np.where(y == 0)[0]
+    B_indices = np.where(y == 1)[0]
+    return X, A_indices, B_indices
+
+
+def run_build_benchmark(point_counts=POINT_COUNTS, C=10.0, lamb=0.01):
+    print(f"{'n':>8} {'loop (s)':>10} {'matrix (s)':>11} {'speedup':>8}  check")
+    for n_points in point_counts:
+        X, A_indices, B_indices = _split(n_points)
+        center_a = X[A_indices[0]]
+
+        start = time.perf_counter()
+        loop_model, extract = build_qk_model_loop(
+            A_indices, B_indices, X, X, center_a, C, lamb
+        )
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mat_model, x = build_qk_model(A_indices, B_indices, X, X, center_a, C, lamb)
+        mat_model.update()
+        t_mat = time.perf_counter() - start
+
+        check = "-"
+        if n_points <= SOLVE_LIMIT:
+            loop_model.optimize()
+            mat_model.optimize()
+            w_l, xi_l, gamma_l, obj_l = extract()
+            sol = x.X
+            ok = (
+                np.allclose(w_l, sol[:N_FEATURES], atol=1e-5)
+                and np.isclose(xi_l, sol[N_FEATURES], atol=1e-5)
+                and np.isclose(gamma_l, sol[N_FEATURES + 1], atol=1e-5)
+                and np.isclose(obj_l, mat_model.ObjVal, atol=1e-6)
+            )
+            check = "match" if ok else "MISMATCH"
+
+        print(
+            f"{n_points:>8} {t_loop:>10.4f} {t_mat:>11.4f} {t_loop / t_mat:>7.1f}x  {check}"
+        )
+        loop_model.dispose()
+        mat_model.dispose()
+
+
+def set_center_loop(session, center_a):
+    """
+    Reference center change: one chgCoeff call per row of the session.
+    """
+    model = session.model
+    for j in range(session.n_features):
+        model.chgCoeff(session.link, session.w[j], -center_a[j])
+    for rows, sign in ((session.rows_A, 1.0), (session.rows_B, -1.0)):
+        _, l1_norm = qk_blocks(list(rows.keys()), session.X_full, center_a)
+        for (constr, _), norm in zip(rows.values(), l1_norm.tolist()):
+            model.chgCoeff(constr, session.u, sign * norm)
+    session.center = np.array(center_a, dtype=float)
+
+
+def run_center_benchmark(point_counts=POINT_COUNTS, C=10.0, lamb=0.01):
+    print(
+        f"{'n':>8} {'loop (s)':>10} {'column (s)':>11} {'build (s)':>10} {'speedup':>8}"
+    )
+    for n_points in point_counts:
+        X, A_indices, B_indices = _split(n_points)
+        session = GurobiQkSession(X, A_indices, B_indices, C, lamb, lazy_b=0)
+        session._set_center(X[A_indices[0]])
+        model = session.model
+        model.update()
+
+        start = time.perf_counter()
+        set_center_loop(session, X[A_indices[1]])
+        model.update()
+        t_loop = time.perf_counter() - start
+
+        # Large models exceed a size-limited license, so a slack basis stands
+        # in for the basis of a solve
+        variables, constrs = model.getVars(), model.getConstrs()
+        model.setAttr("VBasis", variables, [-1] * len(variables))
+        model.setAttr("CBasis", constrs, [0] * len(constrs))
+        model.update()
+
+        start = time.perf_counter()
+        session._set_center(X[A_indices[2]])
+        model.update()
+        t_column = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_model, _ = build_qk_model(
+            A_indices, B_indices, X, X, X[A_indices[2]], C, lamb
+        )
+        build_model.update()
+        t_build = time.perf_counter() - start
+
+        print(
+            f"{n_points:>8} {t_loop:>10.4f} {t_column:>11.4f} {t_build:>10.4f} "
+            f"{t_loop / t_column:>7.1f}x"
+        )
+        session.dispose()
+        build_model.dispose()
+
+
+if __name__ == "__main__":
+    run_build_benchmark()
+    print()
+    run_center_benchmark()
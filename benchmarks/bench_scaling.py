@@ -0,0 +1,226 @@
+"""
+Scaling Benchmark Suite.
+
+Measures the Q_k build and solve time, RPCF.fit, VNS_RPCF.fit and predict
+throughput on synthetic data (make_moons for d = 2, make_blobs otherwise) over
+a grid of sizes n and dimensions d. Every measurement also records the peak
+Python/NumPy memory reported by tracemalloc.
+
+Results can be saved as a machine-readable baseline and compared against later
+runs; the comparison flags every metric that got slower (or used more memory)
+than the threshold allows and exits with status 1.
+
+Usage:
+    python -m benchmarks.bench_scaling --preset quick --save main
+    python -m benchmarks.bench_scaling --preset quick --compare main [--threshold 0.2]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+from sklearn.datasets import make_blobs, make_moons
+
+from src.rpcf import RPCF
+from src.solvers import build_qk_model, solve_subproblem_qk
+from src.solvers.native_qp import qk_rows
+from src.vns_rpcf import VNS_RPCF
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# (n, d) cases per preset; the full grid skips cases with more than 1e8 values
+PRESETS = {
+    "quick": [(1000, 2), (1000, 10), (10000, 10), (10000, 100)],
+    "full": [
+        (n, d)
+        for n in (10**3, 10**4, 10**5, 10**6)
+        for d in (2, 10, 100, 1000)
+        if n * d <= 10**8
+    ],
+}
+VNS_MAX_POINTS = 10**4  # VNS solves several QPs per cone; larger n takes hours
+C, LAMB = 10.0, 0.01
+# Slowdowns smaller than this many seconds are timer noise, never regressions
+MIN_TIME_DELTA = 0.01
+
+
+def make_data(n, d, seed=0):
+    """
+    Synthetic binary problem with labels in {-1, +1}.
+    """
+    if d == 2:
+        X, y = make_moons(n_samples=n, noise=0.2, random_state=seed)
+    else:
+        X, y = make_blobs(
+            n_samples=n, centers=2, n_features=d, cluster_std=3.0, random_state=seed
+        )
+    return X, np.where(y == 0, -1, 1)
+
+
+def measure(func):
+    """
+    Runs func twice and returns (result, seconds, peak_mb): a timed run, then a
+    run under tracemalloc for the peak memory, whose tracing overhead would
+    otherwise inflate the time. func must give the same work on every call.
+    """
+    # The models print one line per iteration; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def run_case(n, d, solver):
+    X, y = make_data(n, d)
+    A_indices = np.where(y == -1)[0]
+    B_indices = np.where(y == 1)[0]
+    center_a = X[A_indices[0]]
+    metrics = {}
+
+    def record(name, func, rows=None):
+        result, elapsed, peak_mb = measure(func)
+        metrics[name] = {"time": elapsed, "peak_mb": peak_mb}
+        if rows is not None:
+            metrics[name]["throughput"] = rows / elapsed
+        print(f"    {name:<10} {elapsed:>10.4f}s {peak_mb:>10.1f} MB")
+        return result
+
+    if solver == "gurobi":
+
+        def build():
+            model, _ = build_qk_model(A_indices, B_indices, X, X, center_a, C, LAMB)
+            model.update()
+            model.dispose()
+
+    else:
+
+        def build():
+            qk_rows(A_indices, B_indices, X, X, center_a)
+
+    record("qp_build", build, rows=n)
+    record(
+        "qp_solve",
+        lambda: solve_subproblem_qk(
+            A_indices, B_indices, X, X, center_a, C, LAMB, solver=solver
+        ),
+    )
+
+    def seeded_fit(model):
+        # Same center sequence in the timed and the memory run
+        model.rng = np.random.RandomState(0)
+        model.fit(X, y)
+
+    model = RPCF(C=C, lamb=LAMB, solver=solver)
+    record("fit_rpcf", lambda: seeded_fit(model), rows=n)
+    metrics["fit_rpcf"]["n_functions"] = len(model.functions)
+
+    if n <= VNS_MAX_POINTS:
+        vns = VNS_RPCF(C=C, lamb=LAMB, solver=solver)
+        record("fit_vns", lambda: seeded_fit(vns), rows=n)
+        metrics["fit_vns"]["n_functions"] = len(vns.functions)
+
+    record("predict", lambda: model.predict(X), rows=n)
+    return metrics
+
+
+def run_suite(preset, solver):
+    results = {}
+    for n, d in PRESETS[preset]:
+        print(f"  n={n}, d={d}")
+        results[f"n{n}_d{d}"] = run_case(n, d, solver)
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "preset": preset,
+            "solver": solver,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Prints current vs baseline per metric; returns the list of regressions.
+    """
+    regressions = []
+    print(
+        f"  {'case':<16} {'metric':<10} {'base (s)':>10} {'now (s)':>10} {'ratio':>7}"
+    )
+    for case, metrics in current["results"].items():
+        for name, now in metrics.items():
+            base = baseline["results"].get(case, {}).get(name)
+            if base is None:
+                continue
+            ratio = now["time"] / base["time"]
+            flag = ""
+            if ratio > 1 + threshold and now["time"] - base["time"] > MIN_TIME_DELTA:
+                flag = "  SLOWER"
+                regressions.append((case, name, "time", ratio))
+            if now["peak_mb"] > base["peak_mb"] * (1 + threshold) + 1.0:
+                flag += "  MEMORY"
+                regressions.append(
+                    (case, name, "peak_mb", now["peak_mb"] / base["peak_mb"])
+                )
+            print(
+                f"  {case:<16} {name:<10} {base['time']:>10.4f} {now['time']:>10.4f} "
+                f"{ratio:>6.2f}x{flag}"
+            )
+    return regressions
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark suite")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--solver", default="native")
+    parser.add_argument("--save", metavar="NAME", help="Save results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with a baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed relative slowdown"
+    )
+    args = parser.parse_args()
+
+    print(f"Scaling benchmark ({args.preset}, solver={args.solver})")
+    current = run_suite(args.preset, args.solver)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.save), "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {baseline_path(args.save)}")
+
+    if args.compare:
+        with open(baseline_path(args.compare)) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Native vs Gurobi Q_k Agreement Check.
+
+Solves Q_k with both backends on every bundled dataset, for several random
+centers and (C, lambda) pairs, and reports the largest deviation of w, xi,
+gamma and the relative objective gap. The size-limited Gurobi license cannot
+hold the larger datasets, so --max-points subsamples them.
+
+Usage:
+    python -m benchmarks.check_native_solver [--max-points 150]
+"""
+
+import argparse
+
+import numpy as np
+
+from src.dataloader import DatasetLoader
+from src.solvers import solve_subproblem_qk
+
+DATASETS = [
+    "moons",
+    "breast_cancer",
+    "blobs_3d",
+    "wbcd",
+    "wbcp",
+    "heart",
+    "liver",
+    "votes",
+    "ionosphere",
+]
+PARAM_PAIRS = [(0.1, 0.01), (1, 0.1), (10, 0.01), (100, 1)]
+# Q_k is only 2*lambda strongly convex, so an objective within the solvers'
+# ~1e-8 optimality tolerance allows parameter differences around 1e-3.
+PARAM_TOLERANCE = 1e-3
+OBJ_TOLERANCE = 1e-6
+
+
+def compare_on_dataset(X, y, n_centers=3, seed=0):
+    rng = np.random.default_rng(seed)
+    A_indices = np.where(y == np.min(y))[0]
+    B_indices = np.where(y != np.min(y))[0]
+
+    worst_param, worst_obj = 0.0, 0.0
+    for C, lamb in PARAM_PAIRS:
+        for center_idx in rng.choice(A_indices, n_centers, replace=False):
+            args = (A_indices, B_indices, X, X, X[center_idx], C, lamb)
+            ref = solve_subproblem_qk(*args, solver="gurobi")
+            nat = solve_subproblem_qk(*args, solver="native")
+            if ref is None or nat is None:
+                continue
+            diff = max(
+                np.max(np.abs(ref["w"] - nat["w"])),
+                abs(ref["xi"] - nat["xi"]),
+                abs(ref["gamma"] - nat["gamma"]),
+            )
+            gap = (nat["obj"] - ref["obj"]) / max(1.0, abs(ref["obj"]))
+            worst_param = max(worst_param, diff)
+            worst_obj = max(worst_obj, abs(gap))
+    return worst_param, worst_obj
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-points", type=int, default=None)
+    args = parser.parse_args()
+
+    loader = DatasetLoader()
+    print(f"{'dataset':<14} {'max |du|':>10} {'max obj gap':>12}  status")
+    for ds_name in DATASETS:
+        try:
+            X, y = loader.load_dataset(ds_name)
+        except (OSError, RuntimeError, ImportError, ValueError) as e:
+            # No network, offline mode without a cache, or ucimlrepo missing
+            print(f"{ds_name:<14} skipped ({e})")
+            continue
+
+        if args.max_points and len(X) > args.max_points:
+            idx = np.random.default_rng(0).choice(
+                len(X), args.max_points, replace=False
+            )
+            X, y = X[idx], y[idx]
+
+        worst_param, worst_obj = compare_on_dataset(X, y)
+        ok = worst_param <= PARAM_TOLERANCE and worst_obj <= OBJ_TOLERANCE
+        status = "ok" if ok else "MISMATCH"
+        print(f"{ds_name:<14} {worst_param:>10.2e} {worst_obj:>12.2e}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,136 +4,331 @@ Main execution script for r-PCF and VNS-RPCF Benchmarks.
 This script runs a comprehensive benchmark comparing the standard r-PCF algorithm
 with the VNS-enhanced version across multiple UCI datasets. It handles data loading,
 preprocessing, grid search for hyperparameter tuning, training, and result reporting.
+
+Every dataset is split into jobs (tune -> rpcf, vns -> report) that run on a
+process pool. Finished jobs are recorded in solutions/manifest.json, so an
+interrupted run resumes where it stopped.
 """
 
-import time
+import argparse
+import contextlib
+import copy
+import json
+import multiprocessing as mp
 import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
 import numpy as np
 from sklearn.model_selection import train_test_split
+
 from src.dataloader import DatasetLoader
+from src.grid_search import print_tuning_table, tune_rpcf
 from src.rpcf import RPCF
-from src.vns_rpcf import VNS_RPCF
-from src.grid_search import grid_search_rpcf
+from src.solvers import get_environment, set_thread_limit, solve_stats
 from src.utils import plot_and_save, save_dataset_results
+from src.vns_rpcf import VNS_RPCF
 
+try:
+    from gurobipy import GurobiError
+except ImportError:
+    GurobiError = RuntimeError
 
-def run_all_benchmarks():
-    datasets = [
-        "moons",
-        "breast_cancer",
-        "blobs_3d",
-        "wbcd",
-        "wbcp",
-        "heart",
-        "liver",
-        "votes",
-        "ionosphere",
-    ]
+DATASETS = [
+    "moons",
+    "breast_cancer",
+    "blobs_3d",
+    "wbcd",
+    "wbcp",
+    "heart",
+    "liver",
+    "votes",
+    "ionosphere",
+]
+
+MANIFEST_PATH = "solutions/manifest.json"
+MODEL_DIR = "solutions/models"
+
+# Job stages per dataset and the stages each one waits for
+STAGES = {
+    "tune": [],
+    "rpcf": ["tune"],
+    "vns": ["tune"],
+    "report": ["rpcf", "vns"],
+}
+
+# Failures that cost one job: solver and license errors, unavailable data or
+# optional packages, numerical problems and a crashed worker (BrokenProcessPool
+# is a RuntimeError). Anything else is a bug and stops the run.
+JOB_ERRORS = (
+    GurobiError,
+    OSError,
+    RuntimeError,
+    ImportError,
+    ValueError,
+    ArithmeticError,
+    MemoryError,
+)
+
+# Environment variables that cap the BLAS / OpenMP threads of a worker
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+]
+
+
+def load_split(ds_name):
+    """
+    Loads a dataset, maps its labels to {-1, +1} and splits it 70/30.
 
+    Returns:
+        Tuple (loader, X, y, X_train, X_test, y_train, y_test)
+    """
     loader = DatasetLoader()
-    if not os.path.exists("solutions"):
-        os.makedirs("solutions")
+    X, y = loader.load_dataset(ds_name)
 
-    print(f"Starting Benchmark Suite on {len(datasets)} datasets...")
-    print("=" * 60)
+    # Ensure binary labels are mapped to {-1, +1} for the algorithm
+    uniques = np.unique(y)
+    if set(uniques) == {0, 1}:
+        y = np.where(y == 0, -1, 1)
+    elif -1 not in uniques:
+        # Fallback: map the minimum value to -1, others to 1
+        min_val = np.min(uniques)
+        y = np.where(y == min_val, -1, 1)
 
-    for ds_name in datasets:
-        print(f"\nProcessing Dataset: {ds_name}")
-        try:
-            X, y = loader.load_dataset(ds_name)
-        except Exception as e:
-            print(f"Error loading {ds_name}: {e}")
-            continue
-
-        # Ensure binary labels are mapped to {-1, +1} for the algorithm
-        uniques = np.unique(y)
-        if set(uniques) == {0, 1}:
-            y = np.where(y == 0, -1, 1)
-        elif -1 not in uniques:
-            # Fallback: map the minimum value to -1, others to 1
-            min_val = np.min(uniques)
-            y = np.where(y == min_val, -1, 1)
-
-        # Split data into Training and Test sets (Stratified)
-        try:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.3, stratify=y, random_state=42
-            )
-        except ValueError:
-            # Fallback for datasets with very small class counts where stratification fails
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.3, random_state=42
-            )
+    # Split data into Training and Test sets (Stratified)
+    try:
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.3, stratify=y, random_state=42
+        )
+    except ValueError:
+        # Fallback for datasets with very small class counts where stratification fails
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.3, random_state=42
+        )
+    return loader, X, y, X_train, X_test, y_train, y_test
 
-        # --- Grid Search for Hyperparameters ---
-        print("  > Performing Grid Search...")
-        # For simplicity/speed, we use a fixed validation split from X_train
-        try:
-            X_t, X_v, y_t, y_v = train_test_split(
-                X_train, y_train, test_size=0.2, random_state=42
-            )
-            best_params = grid_search_rpcf(X_t, y_t, X_v, y_v)
-            print(f"    Best Params: {best_params}")
-            C_opt = best_params["C"]
-            lamb_opt = best_params["lamb"]
-        except Exception as e:
-            print(f"    Grid Search Failed: {e}. Using defaults.")
-            C_opt, lamb_opt = 10.0, 0.01
-
-        # --- Standard RPCF ---
-        print(f"  > Training Standard RPCF (C={C_opt}, lamb={lamb_opt})...")
-        start = time.time()
-        rpcf = RPCF(C=C_opt, lamb=lamb_opt)
-        try:
-            rpcf.fit(X_train, y_train)
-            t_rpcf = time.time() - start
-            print(f"    Done in {t_rpcf:.2f}s. Centers: {len(rpcf.functions)}")
-        except Exception as e:
-            print(f"    Failed: {e}")
-            rpcf = None
-            t_rpcf = 0
 
-        # Plot if 2D
-        if rpcf and X.shape[1] == 2:
-            plot_and_save(
-                rpcf, X, y, f"RPCF - {ds_name}", f"solutions/{ds_name}_rpcf.png"
+def model_path(ds_name, stage):
+    return os.path.join(MODEL_DIR, f"{ds_name}_{stage}.bin")
+
+
+@contextlib.contextmanager
+def thread_env(n_threads):
+    """
+    Sets THREAD_ENV_VARS for the duration of the block, so workers spawned in
+    it inherit the cap before they import NumPy, then restores the old values.
+    """
+    saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    os.environ.update({name: str(n_threads) for name in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _init_worker(threads_per_worker):
+    # Gurobi defaults to one thread per core; cap it so workers do not compete
+    set_thread_limit(threads_per_worker)
+
+
+def run_job(ds_name, stage, deps):
+    """
+    Runs one (dataset, stage) job.
+
+    Args:
+        ds_name: Dataset name
+        stage: One of STAGES
+        deps: Results of the stages this one depends on
+
+    Returns:
+        JSON-serializable result dictionary
+    """
+    loader, X, y, X_train, X_test, y_train, y_test = load_split(ds_name)
+
+    if stage == "tune":
+        # --- Cross-Validated Tuning for Hyperparameters ---
+        print(f"  > [{ds_name}] Performing Grid Search (k-fold, successive halving)...")
+        tuning = tune_rpcf(X_train, y_train, n_splits=5, n_jobs=1)
+        print_tuning_table(tuning["results"])
+        return tuning["best_params"]
+
+    if stage in ("rpcf", "vns"):
+        params = deps.get("tune") or {"C": 10.0, "lamb": 0.01}
+        C_opt, lamb_opt = params["C"], params["lamb"]
+        if stage == "rpcf":
+            print(
+                f"  > [{ds_name}] Training Standard RPCF (C={C_opt}, lamb={lamb_opt})..."
+            )
+            model = RPCF(C=C_opt, lamb=lamb_opt)
+            title, filename = f"RPCF - {ds_name}", f"solutions/{ds_name}_rpcf.png"
+        else:
+            print(f"  > [{ds_name}] Training VNS-RPCF (Optimized)..")
+            model = VNS_RPCF(
+                C=C_opt,
+                lamb=lamb_opt,
+                k_neighbors=20,
+                max_vns_iter=5,
+                max_neighbors_check=5,
             )
+            title = f"VNS-RPCF - {ds_name}"
+            filename = f"solutions/{ds_name}_vns_rpcf.png"
 
-        # --- VNS RPCF ---
-        print("  > Training VNS-RPCF (Optimized)..")
+        get_environment().reset_stats()
         start = time.time()
-        vns_rpcf = VNS_RPCF(
-            C=C_opt,
-            lamb=lamb_opt,
-            k_neighbors=20,
-            max_vns_iter=5,
-            max_neighbors_check=5,
+        model.fit(X_train, y_train)
+        elapsed = time.time() - start
+        model.scaler = copy.deepcopy(loader.scaler)
+        stats = solve_stats()
+        print(
+            f"    [{ds_name}] Done in {elapsed:.2f}s. Centers: {len(model.functions)}"
+            f", train acc: {model.train_accuracy:.4f}"
+            f", Q_k solves: {stats['solves']} ({stats['runtime']:.2f}s in solver)"
         )
-        try:
-            vns_rpcf.fit(X_train, y_train)
-            t_vns = time.time() - start
-            print(f"    Done in {t_vns:.2f}s. Centers: {len(vns_rpcf.functions)}")
-        except Exception as e:
-            print(f"    Failed: {e}")
-            vns_rpcf = None
-            t_vns = 0
 
         # Plot if 2D
-        if vns_rpcf and X.shape[1] == 2:
-            plot_and_save(
-                vns_rpcf,
-                X,
-                y,
-                f"VNS-RPCF - {ds_name}",
-                f"solutions/{ds_name}_vns_rpcf.png",
-            )
+        if X.shape[1] == 2:
+            plot_and_save(model, X, y, title, filename)
+
+        model.save(model_path(ds_name, stage))
+        return {"time": elapsed, "n_functions": len(model.functions)}
 
+    if stage == "report":
         # --- Save Detailed Results ---
-        save_dataset_results(ds_name, X_test, y_test, rpcf, vns_rpcf, t_rpcf, t_vns)
+        models = {}
+        for kind in ("rpcf", "vns"):
+            models[kind] = (
+                RPCF.load(model_path(ds_name, kind), mmap=False)
+                if deps.get(kind) is not None
+                else None
+            )
+        save_dataset_results(
+            ds_name,
+            X_test,
+            y_test,
+            models["rpcf"],
+            models["vns"],
+            (deps.get("rpcf") or {}).get("time", 0),
+            (deps.get("vns") or {}).get("time", 0),
+        )
+        return {}
+
+    raise ValueError(f"Unknown stage '{stage}'")
+
+
+def load_manifest(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(manifest, path):
+    # Write to a temporary file and rename, so a crash never leaves it truncated
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run_all_benchmarks(
+    datasets=None, max_workers=None, threads_per_worker=1, resume=True
+):
+    """
+    Runs the benchmark jobs of all datasets on a process pool.
+
+    Args:
+        datasets: Dataset names (defaults to DATASETS)
+        max_workers: Concurrent jobs (defaults to cores // threads_per_worker)
+        threads_per_worker: Gurobi / BLAS thread cap of every worker
+        resume: Skip the jobs the manifest already records as done
+    """
+    datasets = datasets or DATASETS
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    manifest = load_manifest(MANIFEST_PATH) if resume else {}
+
+    def result_of(ds_name, stage):
+        entry = manifest.get(f"{ds_name}/{stage}")
+        return entry["result"] if entry and entry["status"] == "done" else None
+
+    pending = [
+        (ds_name, stage)
+        for ds_name in datasets
+        for stage in STAGES
+        if result_of(ds_name, stage) is None
+    ]
+    print(f"Starting Benchmark Suite on {len(datasets)} datasets...")
+    print(f"  {len(pending)} jobs to run, {max_workers} workers")
+    print("=" * 60)
+
+    running = {}
+    finished = set()
+    # The pool spawns workers as jobs are submitted, so the caps stay set
+    # until it has shut down
+    with (
+        thread_env(threads_per_worker),
+        ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads_per_worker,),
+        ) as executor,
+    ):
+        while pending or running:
+            # Submit every job whose dependencies have all finished
+            for ds_name, stage in list(pending):
+                deps = STAGES[stage]
+                if all(
+                    result_of(ds_name, dep) is not None or (ds_name, dep) in finished
+                    for dep in deps
+                ):
+                    dep_results = {dep: result_of(ds_name, dep) for dep in deps}
+                    future = executor.submit(run_job, ds_name, stage, dep_results)
+                    running[future] = (ds_name, stage)
+                    pending.remove((ds_name, stage))
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                ds_name, stage = running.pop(future)
+                finished.add((ds_name, stage))
+                try:
+                    entry = {"status": "done", "result": future.result()}
+                except JOB_ERRORS as e:
+                    print(f"    [{ds_name}] {stage} failed: {e}")
+                    # Includes the worker's traceback (chained by the pool)
+                    entry = {
+                        "status": "failed",
+                        "error": str(e),
+                        "traceback": "".join(traceback.format_exception(e)),
+                    }
+                manifest[f"{ds_name}/{stage}"] = entry
+                save_manifest(manifest, MANIFEST_PATH)
 
     print("\n" + "=" * 60)
     print("All Benchmarks Completed. Check 'solutions/' directory for results.")
 
 
 if __name__ == "__main__":
-    run_all_benchmarks()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--datasets", nargs="+", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument(
+        "--fresh", action="store_true", help="Ignore the manifest and rerun all jobs"
+    )
+    args = parser.parse_args()
+    run_all_benchmarks(
+        args.datasets,
+        max_workers=args.workers,
+        threads_per_worker=args.threads,
+        resume=not args.fresh,
+    )
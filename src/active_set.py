@@ -0,0 +1,219 @@
+"""
+Active Set Module.
+
+Tracks which A and B points are still active during RPCF.fit, together with a
+running per-point minimum of the learned cone values and, for every covered
+point, a cone that covers it. Adding a cone updates the caches in place and
+prunes the covered points, so the fit loop does no list round-trips and the
+training-set prediction is available for free. RPCF.partial_fit appends new
+points and re-checks only the points whose cone changed.
+"""
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+# Rows per block when evaluating a cone, caps the (rows x d) temporaries
+CHUNK_SIZE = 65536
+
+
+def grow(array, n_rows):
+    """
+    Returns array if it has at least n_rows rows, else a copy with room for at
+    least n_rows (the capacity doubles, so appending is O(1) amortized per row).
+    Rows beyond the original ones are uninitialized.
+    """
+    if len(array) >= n_rows:
+        return array
+    grown = np.empty((max(n_rows, 2 * len(array)), *array.shape[1:]), array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class ActiveSet:
+    """
+    Boolean membership masks plus compact index arrays for the sets A and B.
+
+    Args:
+        X: Full training matrix (indices refer to its rows)
+        A_indices: Initial indices of Set A (Class -1)
+        B_indices: Initial indices of Set B (Class +1)
+        sample_weight: Optional per-row weights; count_covered then sums them
+    """
+
+    def __init__(self, X, A_indices, B_indices, sample_weight=None):
+        self.X = X
+        self.sample_weight = sample_weight
+        n = len(X)
+        self.A_indices = np.asarray(A_indices, dtype=np.intp)
+        self.B_indices = np.asarray(B_indices, dtype=np.intp)
+        self._A_mask = np.zeros(n, dtype=bool)
+        self._B_mask = np.zeros(n, dtype=bool)
+        self._A_mask[self.A_indices] = True
+        self._B_mask[self.B_indices] = True
+        # min over the cones so far of g_k(x); +inf before the first cone. Only
+        # its sign is kept exact for points whose cone was re-solved
+        self._min_g = np.full(n, np.inf)
+        # Index of a cone with g_k(x) <= 0 (the one that pruned x), -1 if none
+        self._cone_of = np.full(n, -1, dtype=np.intp)
+        self.n_cones = 0
+        self._views(n)
+
+    def _views(self, n):
+        # The per-point arrays are the first n rows of growable buffers
+        self.A_mask = self._A_mask[:n]
+        self.B_mask = self._B_mask[:n]
+        self.min_g = self._min_g[:n]
+        self.cone_of = self._cone_of[:n]
+
+    def extend(self, X, A_new, B_new, sample_weight=None):
+        """
+        Appends the rows of X beyond the current ones; A_new and B_new (indices
+        into X) become active, uncovered points.
+
+        Args:
+            X: Training matrix with the new rows appended
+            A_new, B_new: Indices of the new A and B points
+            sample_weight: Per-row weights of X, or None
+        """
+        n_old, n = len(self.min_g), len(X)
+        self._A_mask = grow(self._A_mask, n)
+        self._B_mask = grow(self._B_mask, n)
+        self._min_g = grow(self._min_g, n)
+        self._cone_of = grow(self._cone_of, n)
+        self._views(n)
+        self.X = X
+        self.sample_weight = sample_weight
+        self.A_mask[n_old:] = False
+        self.B_mask[n_old:] = False
+        self.min_g[n_old:] = np.inf
+        self.cone_of[n_old:] = -1
+        self.A_mask[A_new] = True
+        self.B_mask[B_new] = True
+        self.A_indices = np.concatenate([self.A_indices, A_new]).astype(np.intp)
+        self.B_indices = np.concatenate([self.B_indices, B_new]).astype(np.intp)
+
+    def update(self, indices, min_g, cone_of, is_A):
+        """
+        Sets the cone values of re-checked points: min_g and a covering cone
+        (-1 if none) per point. Covered points leave the active sets and
+        uncovered ones (A points of class -1 where is_A) join them.
+        """
+        self.min_g[indices] = min_g
+        self.cone_of[indices] = cone_of
+        uncovered = min_g > 0
+        self.A_mask[indices] = uncovered & is_A
+        self.B_mask[indices] = uncovered & ~is_A
+        self.A_indices = np.flatnonzero(self.A_mask)
+        self.B_indices = np.flatnonzero(self.B_mask)
+
+    def covered_by(self, cones):
+        """
+        Indices of the points whose recorded covering cone is one of cones.
+        """
+        return np.flatnonzero(np.isin(self.cone_of, cones))
+
+    def evaluate(self, indices, w, xi, gamma, center):
+        """
+        Calculates g(x) = w'(x-a) + xi*||x-a||_1 - gamma for the given rows.
+        """
+        g_vals = np.empty(len(indices))
+        for start in range(0, len(indices), CHUNK_SIZE):
+            block = indices[start : start + CHUNK_SIZE]
+            diff = self.X[block] - center
+            g_vals[start : start + len(block)] = (
+                diff @ w + xi * np.abs(diff, out=diff).sum(axis=1) - gamma
+            )
+        return g_vals
+
+    def count_covered(self, w, xi, gamma, center):
+        """
+        Number of active A points with g(a) <= 0 (the points a cone would remove),
+        or their total sample weight.
+        """
+        covered = self.evaluate(self.A_indices, w, xi, gamma, center) <= 0
+        if self.sample_weight is not None:
+            return float(self.sample_weight[self.A_indices[covered]].sum())
+        return int(np.count_nonzero(covered))
+
+    def remaining(self):
+        """
+        Number of active A points still to cover, or their total sample weight.
+        """
+        if self.sample_weight is not None:
+            return float(self.sample_weight[self.A_indices].sum())
+        return len(self.A_indices)
+
+    def l1_ball_counts(self, center_indices):
+        """
+        Cheap surrogate of count_covered for several candidate centers at once:
+        the number (or weight) of active A points strictly closer to the center
+        in L1 than the nearest active B point.
+        """
+        centers = self.X[np.asarray(center_indices, dtype=np.intp)]
+        radius = np.full(len(centers), np.inf)
+        for start in range(0, len(self.B_indices), CHUNK_SIZE):
+            block = self.X[self.B_indices[start : start + CHUNK_SIZE]]
+            radius = np.minimum(radius, cdist(centers, block, "cityblock").min(axis=1))
+
+        counts = np.zeros(len(centers))
+        for start in range(0, len(self.A_indices), CHUNK_SIZE):
+            block = self.A_indices[start : start + CHUNK_SIZE]
+            inside = cdist(centers, self.X[block], "cityblock") < radius[:, None]
+            if self.sample_weight is None:
+                counts += inside.sum(axis=1)
+            else:
+                counts += inside @ self.sample_weight[block]
+        return counts
+
+    def add_cone(self, w, xi, gamma, center):
+        """
+        Folds a new cone into the min-g cache and prunes the covered points.
+
+        Only the active rows are evaluated; inactive points already have
+        min_g <= 0, which no later cone can change.
+
+        Returns:
+            Tuple (A_removed, B_removed) of index arrays.
+        """
+        g_A = self.evaluate(self.A_indices, w, xi, gamma, center)
+        g_B = self.evaluate(self.B_indices, w, xi, gamma, center)
+        self.min_g[self.A_indices] = np.minimum(self.min_g[self.A_indices], g_A)
+        self.min_g[self.B_indices] = np.minimum(self.min_g[self.B_indices], g_B)
+
+        # Keep points where g > 0 (not covered by the cone yet)
+        A_removed = self.A_indices[g_A <= 0]
+        B_removed = self.B_indices[g_B <= 0]
+        self.cone_of[A_removed] = self.n_cones
+        self.cone_of[B_removed] = self.n_cones
+        self.n_cones += 1
+        self.A_mask[A_removed] = False
+        self.B_mask[B_removed] = False
+        self.A_indices = self.A_indices[g_A > 0]
+        self.B_indices = self.B_indices[g_B > 0]
+        return A_removed, B_removed
+
+    def restore(self, A_mask, B_mask, functions):
+        """
+        Resets the active sets to saved masks and rebuilds min_g and the
+        covering cones from the cones learned so far (used to resume a fit).
+        """
+        self.A_mask[:] = A_mask
+        self.B_mask[:] = B_mask
+        self.A_indices = np.flatnonzero(self.A_mask)
+        self.B_indices = np.flatnonzero(self.B_mask)
+        all_indices = np.arange(len(self.X))
+        self.min_g[:] = np.inf
+        self.cone_of[:] = -1
+        for k, f in enumerate(functions):
+            g_vals = self.evaluate(
+                all_indices, f["w"], f["xi"], f["gamma"], f["center"]
+            )
+            self.cone_of[(g_vals <= 0) & (self.cone_of < 0)] = k
+            np.minimum(self.min_g, g_vals, out=self.min_g)
+        self.n_cones = len(functions)
+
+    def predict(self):
+        """
+        Training-set labels implied by the cones added so far.
+        """
+        return np.where(self.min_g <= 0, -1, 1)
@@ -0,0 +1,96 @@
+"""
+Checkpoint Module.
+
+Snapshots of an RPCF / VNS_RPCF fit in progress, written after every cone so an
+interrupted fit can continue with fit(..., resume_from=path). The file layout
+follows src.model_io, except that every block keeps its own dtype:
+
+    MAGIC (8 bytes) | header length (uint64) | JSON header | padding | blocks
+
+The JSON header holds the scalar state (iteration, RNG position, ...) and, per
+block, its byte offset, shape and dtype; blocks start on 64-byte boundaries.
+Files are written to a temporary name, synced and renamed, so a crash while
+writing leaves the previous checkpoint intact.
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"RPCFCKP1"
+ALIGNMENT = 64
+
+
+def data_fingerprint(X, y):
+    """
+    Short digest of the training data, stored to refuse resuming on other data.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def write_checkpoint(path, header, blocks):
+    """
+    Atomically writes a checkpoint.
+
+    Args:
+        path: Output file
+        header: JSON-serializable dict of scalar state
+        blocks: Dict name -> NumPy array
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in blocks.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset += -offset % ALIGNMENT
+        layout[name] = [offset, list(array.shape), array.dtype.str]
+        offset += array.nbytes
+
+    meta = json.dumps({**header, "layout": layout}).encode()
+    prefix = len(MAGIC) + 8 + len(meta)
+    meta += b" " * (-prefix % ALIGNMENT)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(meta)))
+        f.write(meta)
+        start = f.tell()
+        for name, array in arrays.items():
+            f.write(b"\0" * (start + layout[name][0] - f.tell()))
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path):
+    """
+    Reads a checkpoint written by write_checkpoint.
+
+    Returns:
+        Tuple (header, arrays) with the header dict (layout removed) and a dict
+        name -> NumPy array.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an RPCF checkpoint")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len))
+        data = f.read()
+
+    arrays = {}
+    for name, (offset, shape, dtype) in header.pop("layout").items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(
+            data, dtype=dtype, count=count, offset=offset
+        ).reshape(shape)
+    return header, arrays
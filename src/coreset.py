@@ -0,0 +1,102 @@
+"""
+Coreset Module.
+
+Compresses each class of a large training set into a small weighted subset
+before RPCF.fit solves any Q_k. Every kept point carries a weight (the number
+of original points it stands for), which RPCF passes on as sample_weight to the
+1/m and C/p slack weights of Q_k.
+
+    "kmeans"    k-means per class; keeps the medoid (the real point nearest to
+                the centroid) of every cluster, weighted by the cluster size.
+    "boundary"  Importance sampling that favors points close to the other
+                class, weighted by the inverse sampling probability.
+"""
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.neighbors import NearestNeighbors
+
+CORESET_METHODS = ("kmeans", "boundary")
+
+
+def _class_budgets(counts, size):
+    # Proportional split of the coreset size, at least one point per class
+    budgets = np.maximum(1, np.floor(counts * size / counts.sum())).astype(int)
+    return np.minimum(budgets, counts)
+
+
+def _kmeans_medoids(X_c, k, random_state):
+    """
+    Returns (positions, weights): the medoid of every k-means cluster of X_c and
+    the cluster sizes.
+    """
+    km = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3)
+    labels = km.fit_predict(X_c)
+    dist = np.linalg.norm(X_c - km.cluster_centers_[labels], axis=1)
+    # Sort by (label, distance); the first row of every label is its medoid
+    order = np.lexsort((dist, labels))
+    first = np.flatnonzero(np.diff(labels[order], prepend=-1))
+    positions = order[first]
+    return positions, np.bincount(labels)[labels[positions]].astype(float)
+
+
+def _boundary_sample(X_c, X_other, k, rng):
+    """
+    Returns (positions, weights): k draws from X_c with probability rising as a
+    point gets closer to the other class, merged into unique points with
+    importance weights 1 / (k * p) that sum to about len(X_c).
+    """
+    n = len(X_c)
+    if len(X_other) == 0:
+        prob = np.full(n, 1.0 / n)
+    else:
+        dist, _ = NearestNeighbors(n_neighbors=1).fit(X_other).kneighbors(X_c)
+        score = 1.0 / (dist[:, 0] + 1e-12)
+        # Half uniform so no region of the class is left without samples
+        prob = 0.5 * score / score.sum() + 0.5 / n
+    draws = rng.choice(n, size=k, replace=True, p=prob)
+    positions, counts = np.unique(draws, return_counts=True)
+    return positions, counts / (k * prob[positions])
+
+
+def build_coreset(X, y, size, method="kmeans", random_state=0):
+    """
+    Selects a weighted subset of about size points, split over the classes in
+    proportion to their sizes.
+
+    Args:
+        X: Training matrix
+        y: Labels (any values; each class is compressed on its own)
+        size: Target number of points
+        method: One of CORESET_METHODS
+        random_state: Seed of k-means / the sampling
+
+    Returns:
+        Tuple (indices, weights): sorted row indices into X and one weight per
+        kept row.
+    """
+    if method not in CORESET_METHODS:
+        raise ValueError(
+            f"Coreset method '{method}' not found. "
+            f"Available: {', '.join(CORESET_METHODS)}"
+        )
+    rng = np.random.RandomState(random_state)
+    labels, counts = np.unique(y, return_counts=True)
+    budgets = _class_budgets(counts, size)
+
+    indices, weights = [], []
+    for label, budget in zip(labels, budgets):
+        members = np.flatnonzero(y == label)
+        if budget >= len(members):
+            positions, w = np.arange(len(members)), np.ones(len(members))
+        elif method == "kmeans":
+            positions, w = _kmeans_medoids(X[members], budget, random_state)
+        else:
+            positions, w = _boundary_sample(X[members], X[y != label], budget, rng)
+        indices.append(members[positions])
+        weights.append(w)
+
+    indices = np.concatenate(indices)
+    weights = np.concatenate(weights)
+    order = np.argsort(indices)
+    return indices[order], weights[order]
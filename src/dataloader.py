@@ -4,18 +4,49 @@ Data Loading Module.
 This module is responsible for fetching, loading, and preprocessing various datasets
 from sklearn and the UCI Machine Learning Repository. It handles normalization (StandardScaler)
 and label encoding to ensure compatibility with the r-PCF text.
+
+Preprocessed UCI datasets are kept in a content-addressed cache under data/cache
+(objects/<sha256>/X.npy, y.npy, ... plus index/<name>.json, which maps each
+dataset name to its digest). Every file is written under a per-process temp
+name and renamed into place, so concurrent loaders never see partial files or
+lose each other's index entries. Warm loads memory-map the arrays, offline mode
+never touches the network, and the cache can be seeded from local CSV files.
 """
 
+import hashlib
+import json
+import os
+import uuid
+from types import SimpleNamespace
+
 import numpy as np
-from sklearn.datasets import make_moons, load_breast_cancer, make_blobs
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.datasets import load_breast_cancer, make_blobs, make_moons
 from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import LabelEncoder, StandardScaler
 
 try:
     from ucimlrepo import fetch_ucirepo
 except ImportError:
     fetch_ucirepo = None
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# UCI Repo IDs of the datasets that are fetched over the network (and cached)
+UCI_DATASETS = {
+    "wbcd": 17,
+    "wbcp": 16,
+    "heart": 45,
+    "liver": 60,
+    "votes": 105,
+    "ionosphere": 52,
+}
+
+# Bump when the preprocessing changes, so stale cache entries are not reused
+CACHE_VERSION = 1
+
 
 class DatasetLoader:
     """
@@ -23,10 +54,147 @@ class DatasetLoader:
     Supports both synthetic (sklearn) and real-world (UCI) datasets.
     """
 
-    def __init__(self):
+    def __init__(self, cache_dir="data/cache", use_cache=True, offline=None):
+        """
+        Args:
+            cache_dir: Root of the preprocessed dataset cache
+            use_cache: Read and write the cache for the UCI datasets
+            offline: Never fetch over the network (defaults to the RPCF_OFFLINE
+                environment variable); missing datasets then raise an error
+        """
         self.scaler = StandardScaler()
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        if offline is None:
+            offline = os.environ.get("RPCF_OFFLINE", "") not in ("", "0")
+        self.offline = offline
+        self._source = None  # (features, targets) override used for CSV seeding
 
     def load_dataset(self, dataset_name):
+        """
+        Loads a dataset, from the cache when possible.
+        """
+        if self.use_cache and dataset_name in UCI_DATASETS:
+            cached = self._load_cached(dataset_name)
+            if cached is not None:
+                print(f"\n--- Loading '{dataset_name}' Dataset [from cache] ---")
+                return cached
+            if self.offline:
+                raise RuntimeError(
+                    f"Dataset '{dataset_name}' is not cached and offline mode is on"
+                )
+            X, y = self._dispatch(dataset_name)
+            self._store_cached(dataset_name, X, y)
+            return X, y
+        return self._dispatch(dataset_name)
+
+    def _fetch_uci(self, uci_id):
+        """
+        Returns the ucimlrepo dataset object (or the CSV override when seeding).
+        """
+        if self._source is not None:
+            features, targets = self._source
+            return SimpleNamespace(
+                data=SimpleNamespace(features=features, targets=targets)
+            )
+        if self.offline:
+            raise RuntimeError(f"Offline mode: cannot fetch UCI dataset {uci_id}")
+        if fetch_ucirepo is None:
+            raise ImportError("ucimlrepo not installed")
+        return fetch_ucirepo(id=uci_id)
+
+    def _index_path(self, dataset_name):
+        return os.path.join(self.cache_dir, "index", f"{dataset_name}.json")
+
+    def _load_cached(self, dataset_name):
+        try:
+            with open(self._index_path(dataset_name)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+        folder = os.path.join(self.cache_dir, "objects", entry["digest"])
+        try:
+            X = np.load(os.path.join(folder, "X.npy"), mmap_mode="r")
+            y = np.load(os.path.join(folder, "y.npy"), mmap_mode="r")
+            mean = np.load(os.path.join(folder, "scaler_mean.npy"))
+            scale = np.load(os.path.join(folder, "scaler_scale.npy"))
+        except OSError:
+            return None
+
+        # Restore the fitted scaler so callers can reuse it for new inputs
+        self.scaler = StandardScaler()
+        self.scaler.mean_ = mean
+        self.scaler.scale_ = scale
+        self.scaler.var_ = scale**2
+        self.scaler.n_features_in_ = len(mean)
+        self.scaler.n_samples_seen_ = len(X)
+        return X, y
+
+    def _store_cached(self, dataset_name, X, y):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        y = np.ascontiguousarray(y)
+        digest = hashlib.sha256()
+        digest.update(f"{dataset_name}:{CACHE_VERSION}:{X.shape}:{y.dtype}".encode())
+        digest.update(X.tobytes())
+        digest.update(y.tobytes())
+        digest = digest.hexdigest()
+
+        folder = os.path.join(self.cache_dir, "objects", digest)
+        os.makedirs(folder, exist_ok=True)
+        arrays = {
+            "X": X,
+            "y": y,
+            "scaler_mean": self.scaler.mean_,
+            "scaler_scale": self.scaler.scale_,
+        }
+        # Write then rename, so concurrent readers never see partial files; the
+        # temp names are unique, so concurrent writers do not share one
+        tmp_suffix = f".{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        for name, array in arrays.items():
+            tmp_path = os.path.join(folder, f"{name}{tmp_suffix}.npy")
+            np.save(tmp_path, array)
+            os.replace(tmp_path, os.path.join(folder, f"{name}.npy"))
+
+        # One index file per dataset: no read-modify-write of a shared index
+        index_path = self._index_path(dataset_name)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        tmp_path = index_path + tmp_suffix
+        with open(tmp_path, "w") as f:
+            json.dump({"digest": digest, "version": CACHE_VERSION}, f, indent=2)
+        os.replace(tmp_path, index_path)
+
+    def seed_from_csv(self, dataset_name, csv_path, target_columns):
+        """
+        Fills the cache from a local CSV copy of a UCI dataset, using the same
+        preprocessing as the network loader.
+
+        Args:
+            dataset_name: One of UCI_DATASETS
+            csv_path: CSV file with the feature columns and the target column(s)
+            target_columns: Name (or list of names) of the target column(s)
+
+        Returns:
+            Tuple (X, y) as stored in the cache
+        """
+        if dataset_name not in UCI_DATASETS:
+            raise ValueError(f"Dataset '{dataset_name}' is not a UCI dataset")
+        if pd is None:
+            raise ImportError("pandas not installed")
+        if isinstance(target_columns, str):
+            target_columns = [target_columns]
+
+        data = pd.read_csv(csv_path, na_values=["?"])
+        self._source = (data.drop(columns=target_columns), data[target_columns])
+        try:
+            X, y = self._dispatch(dataset_name)
+        finally:
+            self._source = None
+        self._store_cached(dataset_name, X, y)
+        return X, y
+
+    def _dispatch(self, dataset_name):
         """
         Dispatches to the specific dataset loader based on the name.
         """
@@ -79,11 +247,8 @@ class DatasetLoader:
         Target: Diagnosis (M = malignant, B = benign)
         """
         print("\n--- Loading 'WBCD' (Diagnosis) Dataset [via ucimlrepo] ---")
-        if fetch_ucirepo is None:
-            raise ImportError("ucimlrepo not installed")
-
         # Fetch dataset
-        dataset = fetch_ucirepo(id=17)
+        dataset = self._fetch_uci(17)
 
         # Extract features and targets
         X = dataset.data.features
@@ -110,11 +275,8 @@ class DatasetLoader:
         Target: Outcome (R = recur, N = nonrecur)
         """
         print("\n--- Loading 'WBCP' (Prognosis) Dataset [via ucimlrepo] ---")
-        if fetch_ucirepo is None:
-            raise ImportError("ucimlrepo not installed")
-
         # Fetch dataset
-        dataset = fetch_ucirepo(id=16)
+        dataset = self._fetch_uci(16)
 
         X = dataset.data.features
         y = dataset.data.targets
@@ -148,11 +310,8 @@ class DatasetLoader:
         Target: Diagnosis (0=healthy, 1-4=sick)
         """
         print("\n--- Loading 'Cleveland Heart' Dataset [via ucimlrepo] ---")
-        if fetch_ucirepo is None:
-            raise ImportError("ucimlrepo not installed")
-
         # Fetch dataset (ID 45 is the main Heart Disease container)
-        dataset = fetch_ucirepo(id=45)
+        dataset = self._fetch_uci(45)
 
         X = dataset.data.features
         y = dataset.data.targets
@@ -180,10 +339,7 @@ class DatasetLoader:
         UCI Repo ID: 60
         """
         print("\n--- Loading 'BUPA Liver' Dataset [via ucimlrepo] ---")
-        if fetch_ucirepo is None:
-            raise ImportError("ucimlrepo not installed")
-
-        dataset = fetch_ucirepo(id=60)
+        dataset = self._fetch_uci(60)
 
         X = dataset.data.features
         y = dataset.data.targets
@@ -209,10 +365,7 @@ class DatasetLoader:
         Target: Party (Democrat/Republican)
         """
         print("\n--- Loading 'Congress Voting' Dataset [via ucimlrepo] ---")
-        if fetch_ucirepo is None:
-            raise ImportError("ucimlrepo not installed")
-
-        dataset = fetch_ucirepo(id=105)
+        dataset = self._fetch_uci(105)
 
         X = dataset.data.features
         y = dataset.data.targets
@@ -247,10 +400,7 @@ class DatasetLoader:
         Target: Class (g=good, b=bad)
         """
         print("\n--- Loading 'Ionosphere' Dataset [via ucimlrepo] ---")
-        if fetch_ucirepo is None:
-            raise ImportError("ucimlrepo not installed")
-
-        dataset = fetch_ucirepo(id=52)
+        dataset = self._fetch_uci(52)
 
         X = dataset.data.features
         y = dataset.data.targets
@@ -1,5 +1,19 @@
+import contextlib
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 from sklearn.metrics import accuracy_score
+from sklearn.model_selection import KFold, StratifiedKFold
+
 from src.rpcf import RPCF
+from src.solvers import configure, worker_settings
+
+# Paper-suggested range (simplified for speed)
+DEFAULT_GRID = {"C": [0.1, 1, 10, 100], "lamb": [0.01, 0.1, 1]}
 
 
 def grid_search_rpcf(X_train, y_train, X_val, y_val):
@@ -17,9 +31,8 @@ def grid_search_rpcf(X_train, y_train, X_val, y_val):
     best_acc = -1.0
     best_params = {"C": 1.0, "lamb": 0.01}
 
-    # Paper-suggested range (simplified for speed)
-    C_values = [0.1, 1, 10, 100]
-    lamb_values = [0.01, 0.1, 1]
+    C_values = DEFAULT_GRID["C"]
+    lamb_values = DEFAULT_GRID["lamb"]
 
     curr = 0
 
@@ -36,8 +49,272 @@ def grid_search_rpcf(X_train, y_train, X_val, y_val):
                 if acc > best_acc:
                     best_acc = acc
                     best_params = {"C": C, "lamb": lamb}
-            except Exception:
-                continue
+            except (ValueError, ArithmeticError) as e:
+                # Degenerate data and numerical failures skip the configuration
+                print(f"    C={C}, lamb={lamb} failed: {type(e).__name__}: {e}")
 
     print(f"  Best Grid Params: {best_params} (Acc: {best_acc:.4f})")
     return best_params
+
+
+# Per-worker copy of the tuning data, filled once by _init_worker
+_worker_data = {}
+
+
+def _init_worker(X, y, folds, solver, solver_settings=None):
+    # Pool workers get solver settings and fit quietly, so the per-iteration
+    # output of concurrent fits does not interleave
+    quiet = solver_settings is not None
+    if quiet:
+        configure(**solver_settings)
+    _worker_data.update(X=X, y=y, folds=folds, solver=solver, quiet=quiet)
+
+
+def _fit_fold(C, lamb, fold, n_samples, seed):
+    """
+    Trains on (a subsample of) one fold's training part and scores its
+    validation part.
+
+    Returns:
+        Tuple (accuracy, fit_seconds, error); accuracy is None on failure.
+    """
+    X, y = _worker_data["X"], _worker_data["y"]
+    train_idx, val_idx = _worker_data["folds"][fold]
+
+    rng = np.random.RandomState(seed)
+    if n_samples < len(train_idx):
+        # Stratified subsample: the same fraction of every class
+        parts = []
+        for label in np.unique(y[train_idx]):
+            class_idx = train_idx[y[train_idx] == label]
+            size = max(1, round(len(class_idx) * n_samples / len(train_idx)))
+            parts.append(rng.choice(class_idx, size=size, replace=False))
+        train_idx = np.sort(np.concatenate(parts))
+
+    start = time.time()
+    try:
+        model = RPCF(C=C, lamb=lamb, solver=_worker_data["solver"])
+        model.rng = rng
+        with contextlib.ExitStack() as stack:
+            if _worker_data["quiet"]:
+                devnull = stack.enter_context(open(os.devnull, "w"))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            model.fit(X[train_idx], y[train_idx])
+        acc = accuracy_score(y[val_idx], model.predict(X[val_idx]))
+        return acc, time.time() - start, None
+    except (ValueError, ArithmeticError) as e:
+        # Degenerate folds (e.g. a single class) and numerical failures; other
+        # errors are bugs and propagate
+        return None, time.time() - start, f"{type(e).__name__}: {e}"
+
+
+def tune_rpcf(
+    X,
+    y,
+    param_grid=None,
+    n_splits=5,
+    n_jobs=-1,
+    halving=True,
+    eta=3,
+    solver="gurobi",
+    random_state=42,
+):
+    """
+    k-fold cross-validated grid search with successive halving.
+
+    With halving, every configuration is first cross-validated on a small
+    stratified subsample of each training fold; only the best 1/eta of them move
+    on to the next rung, where the subsample is eta times larger. The last rung
+    trains on the full folds. The (config, fold) fits of a rung run in a process
+    pool.
+
+    Args:
+        X, y: Training data (labels in {-1, 1})
+        param_grid: Dict with lists for 'C' and 'lamb' (defaults to DEFAULT_GRID)
+        n_splits: Number of cross-validation folds
+        n_jobs: Worker processes (-1 for all cores, 1 runs in-process)
+        halving: Prune configurations with successive halving
+        eta: Halving rate (keep 1/eta of the configurations per rung)
+        solver: Q_k backend passed to RPCF
+        random_state: Seed for the folds, subsamples and centers
+
+    Returns:
+        dict with 'best_params' (C, lamb), 'best_score' and 'results', a list with
+        one row per (configuration, rung): C, lamb, rung, n_samples, mean_acc,
+        std_acc, fit_time (summed over folds) and errors. A failed fold
+        scores 0 accuracy.
+    """
+    grid = param_grid or DEFAULT_GRID
+    configs = [(C, lamb) for C in grid["C"] for lamb in grid["lamb"]]
+
+    try:
+        splitter = StratifiedKFold(n_splits, shuffle=True, random_state=random_state)
+        folds = list(splitter.split(X, y))
+    except ValueError:
+        # Fallback for datasets with very small class counts
+        splitter = KFold(n_splits, shuffle=True, random_state=random_state)
+        folds = list(splitter.split(X))
+    n_train = min(len(train_idx) for train_idx, _ in folds)
+
+    # One rung more for every factor eta in the number of configurations
+    # (integer floor(log_eta) + 1, which float logs can get wrong at powers)
+    n_rungs = 1
+    while halving and eta**n_rungs <= len(configs):
+        n_rungs += 1
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+
+    executor = None
+    if n_jobs > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(X, y, folds, solver, worker_settings(n_jobs)),
+        )
+    else:
+        _init_worker(X, y, folds, solver)
+
+    results = []
+    survivors = configs
+    try:
+        for rung in range(n_rungs):
+            n_samples = max(n_splits, n_train // eta ** (n_rungs - 1 - rung))
+            tasks = [
+                (C, lamb, fold, n_samples, random_state + fold)
+                for C, lamb in survivors
+                for fold in range(n_splits)
+            ]
+            if executor is None:
+                outcomes = [_fit_fold(*task) for task in tasks]
+            else:
+                outcomes = list(executor.map(_fit_fold, *zip(*tasks)))
+
+            rung_rows = []
+            for i, (C, lamb) in enumerate(survivors):
+                fold_outcomes = outcomes[i * n_splits : (i + 1) * n_splits]
+                # A failed fold scores 0, so configurations that fail rank low
+                accs = [0.0 if acc is None else acc for acc, _, _ in fold_outcomes]
+                errors = [err for _, _, err in fold_outcomes if err is not None]
+                for err in errors:
+                    print(f"    C={C}, lamb={lamb} failed: {err}")
+                rung_rows.append(
+                    {
+                        "C": C,
+                        "lamb": lamb,
+                        "rung": rung,
+                        "n_samples": n_samples,
+                        "mean_acc": float(np.mean(accs)),
+                        "std_acc": float(np.std(accs)),
+                        "fit_time": sum(t for _, t, _ in fold_outcomes),
+                        "errors": errors,
+                    }
+                )
+            results.extend(rung_rows)
+
+            rung_rows.sort(key=lambda r: -r["mean_acc"])
+            n_keep = max(1, math.ceil(len(rung_rows) / eta))
+            survivors = [(r["C"], r["lamb"]) for r in rung_rows[:n_keep]]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        _worker_data.clear()
+
+    best = rung_rows[0]
+    best_params = {"C": best["C"], "lamb": best["lamb"]}
+    print(f"  Best CV Params: {best_params} (Acc: {best['mean_acc']:.4f})")
+    return {
+        "best_params": best_params,
+        "best_score": best["mean_acc"],
+        "results": results,
+    }
+
+
+def print_tuning_table(results):
+    """
+    Prints the per-configuration timing and accuracy rows of tune_rpcf.
+    """
+    print(
+        f"    {'rung':>4} {'n':>6} {'C':>8} {'lamb':>6} {'acc':>8} {'std':>7} {'time(s)':>8}"
+    )
+    for r in results:
+        print(
+            f"    {r['rung']:>4} {r['n_samples']:>6} {r['C']:>8} {r['lamb']:>6} "
+            f"{r['mean_acc']:>8.4f} {r['std_acc']:>7.4f} {r['fit_time']:>8.2f}"
+        )
+
+
+def regularization_path(
+    X_train,
+    y_train,
+    X_val,
+    y_val,
+    C_values=None,
+    lamb_values=None,
+    solver="gurobi",
+    random_state=42,
+):
+    """
+    Fits RPCF along a (C, lambda) grid with a fixed center sequence and warm
+    starts.
+
+    The grid is swept in snake order (lambda up for one C, down for the next),
+    so consecutive points are neighbors. Every fit picks its centers from the
+    same random permutation of A, and each Q_k is warm-started from the
+    previous grid point's solution for the same iteration and center (the
+    native solution vector, or the Gurobi simplex basis when the active sets
+    match). All fits share one Q_k session: between grid points it is reset to
+    the full training set and the new C, lambda instead of being rebuilt.
+
+    Args:
+        X_train, y_train: Training data (labels in {-1, 1})
+        X_val, y_val: Validation data
+        C_values, lamb_values: Grid (defaults to DEFAULT_GRID)
+        solver: Q_k backend passed to RPCF
+        random_state: Seed of the center sequence
+
+    Returns:
+        dict with 'best_params', 'best_score' and 'path', a list with one row per
+        grid point in sweep order: C, lamb, acc, n_functions, fit_time.
+    """
+    C_values = C_values or DEFAULT_GRID["C"]
+    lamb_values = sorted(lamb_values or DEFAULT_GRID["lamb"])
+
+    rng = np.random.RandomState(random_state)
+    center_order = rng.permutation(np.where(y_train == -1)[0])
+
+    path = []
+    starts = []
+    model = None
+    try:
+        for i, C in enumerate(sorted(C_values)):
+            for lamb in lamb_values if i % 2 == 0 else lamb_values[::-1]:
+                session = None if model is None else model.session
+                model = RPCF(C=C, lamb=lamb, solver=solver)
+                model.center_order = center_order
+                model.warm_starts = starts
+                model.keep_session = True
+                model.session = session
+
+                start = time.time()
+                model.fit(X_train, y_train)
+                fit_time = time.time() - start
+                starts = model.starts
+
+                path.append(
+                    {
+                        "C": C,
+                        "lamb": lamb,
+                        "acc": accuracy_score(y_val, model.predict(X_val)),
+                        "n_functions": len(model.functions),
+                        "fit_time": fit_time,
+                    }
+                )
+    finally:
+        if model is not None and model.session is not None:
+            model.session.dispose()
+
+    best = max(path, key=lambda row: row["acc"])
+    best_params = {"C": best["C"], "lamb": best["lamb"]}
+    print(f"  Best Path Params: {best_params} (Acc: {best['acc']:.4f})")
+    return {"best_params": best_params, "best_score": best["acc"], "path": path}
@@ -0,0 +1,157 @@
+"""
+Model Persistence Module.
+
+Stores trained RPCF / VNS_RPCF models in a compact binary file:
+
+    MAGIC (8 bytes) | header length (uint64) | JSON header | padding | float64 buffer
+
+The JSON header holds the class name, constructor hyperparameters and the array
+layout. The buffer holds the stacked centers and w (k x d each), xi, gamma and
+obj (k each) and, when a StandardScaler is attached, its mean and scale (d
+each). Loading memory-maps the buffer, so no parsing or copying is needed.
+"""
+
+import inspect
+import json
+import struct
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from sklearn.utils.validation import check_is_fitted
+
+from src.solvers import SOLVERS, SolverBackend
+
+MAGIC = b"RPCFMDL1"
+ALIGNMENT = 64
+
+
+def _plain(name, value):
+    # JSON-serializable form of a hyperparameter; backends are stored by name
+    if isinstance(value, SolverBackend):
+        for solver, backend in SOLVERS.items():
+            if backend == value:
+                return solver
+        raise ValueError(f"Cannot save {name}: the solver backend is not in SOLVERS")
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _hyperparameters(model):
+    # Everything the constructor accepts, read back from the attributes
+    names = list(inspect.signature(type(model).__init__).parameters)[1:]
+    return {name: _plain(name, getattr(model, name)) for name in names}
+
+
+def save_model(model, path):
+    """
+    Writes a trained model to path.
+
+    Args:
+        model: Fitted RPCF or VNS_RPCF
+        path: Output file
+    """
+    functions = model.functions
+    k = len(functions)
+    d = len(functions[0]["w"]) if k else 0
+    blocks = [
+        ("centers", np.array([f["center"] for f in functions], float).reshape(k, d)),
+        ("w", np.array([f["w"] for f in functions], float).reshape(k, d)),
+        ("xi", np.array([f["xi"] for f in functions], float)),
+        ("gamma", np.array([f["gamma"] for f in functions], float)),
+        ("obj", np.array([f.get("obj", np.nan) for f in functions], float)),
+    ]
+
+    scaler = getattr(model, "scaler", None)
+    if scaler is not None:
+        if not isinstance(scaler, StandardScaler):
+            raise TypeError(f"Unsupported scaler type: {type(scaler).__name__}")
+        # NotFittedError instead of an AttributeError on the missing mean_
+        check_is_fitted(scaler)
+        d_in = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(d_in)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(d_in)
+        blocks += [("scaler_mean", mean), ("scaler_scale", scale)]
+
+    layout = {}
+    offset = 0
+    for name, array in blocks:
+        layout[name] = [offset, list(array.shape)]
+        offset += array.size
+
+    header = json.dumps(
+        {
+            "class": type(model).__name__,
+            "params": _hyperparameters(model),
+            "layout": layout,
+            "size": offset,
+        }
+    ).encode()
+    # Pad so the float64 buffer starts on an aligned offset
+    prefix = len(MAGIC) + 8 + len(header)
+    header += b" " * (-prefix % ALIGNMENT)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for _, array in blocks:
+            f.write(np.ascontiguousarray(array, dtype="<f8").tobytes())
+
+
+def load_model(path, mmap=True):
+    """
+    Reads a model written by save_model.
+
+    Args:
+        path: Model file
+        mmap: Memory-map the parameter buffer instead of reading it
+
+    Returns:
+        Fitted model of the stored class, ready for predict
+    """
+    # Local import, src.rpcf imports this module for RPCF.save / RPCF.load
+    from src.rpcf import RPCF
+    from src.vns_rpcf import VNS_RPCF
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an RPCF model file")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len))
+        offset = f.tell()
+        if mmap:
+            buffer = np.memmap(
+                path, dtype="<f8", mode="r", offset=offset, shape=(header["size"],)
+            )
+        else:
+            buffer = np.fromfile(f, dtype="<f8", count=header["size"])
+
+    arrays = {
+        name: buffer[start : start + int(np.prod(shape))].reshape(shape)
+        for name, (start, shape) in header["layout"].items()
+    }
+
+    classes = {"RPCF": RPCF, "VNS_RPCF": VNS_RPCF}
+    model = classes[header["class"]](**header["params"])
+    model.functions = [
+        {
+            "w": arrays["w"][i],
+            "xi": float(arrays["xi"][i]),
+            "gamma": float(arrays["gamma"][i]),
+            "obj": float(arrays["obj"][i]),
+            "center": arrays["centers"][i],
+        }
+        for i in range(len(arrays["xi"]))
+    ]
+    model.centers = [f["center"] for f in model.functions]
+
+    if "scaler_mean" in arrays:
+        scaler = StandardScaler()
+        scaler.mean_ = np.array(arrays["scaler_mean"])
+        scaler.scale_ = np.array(arrays["scaler_scale"])
+        scaler.var_ = scaler.scale_**2
+        scaler.n_features_in_ = len(scaler.mean_)
+        scaler.n_samples_seen_ = 0
+        model.scaler = scaler
+    return model
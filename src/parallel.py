@@ -0,0 +1,210 @@
+"""
+Parallel Candidate Evaluation Module.
+
+Provides a persistent process pool that solves Q_k for VNS candidate centers
+concurrently. The training matrix and the current A/B active-set masks are
+placed in shared memory once per fit, so a task only carries the index of the
+candidate center instead of pickled copies of the data.
+"""
+
+import multiprocessing as mp
+import os
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.solvers import (
+    configure,
+    get_environment,
+    qk_blocks,
+    solve_subproblem_qk,
+    worker_settings,
+)
+
+# Per-worker state, filled once by _init_worker
+_worker_state = {}
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(x_spec, mask_spec, C, lamb, solver, sample_weight, solver_settings):
+    configure(**solver_settings)
+    x_shm, X = _attach(*x_spec)
+    mask_shm, masks = _attach(*mask_spec)
+    # Keep the SharedMemory handles alive for the lifetime of the worker
+    _worker_state.update(
+        x_shm=x_shm,
+        mask_shm=mask_shm,
+        X=X,
+        masks=masks,
+        C=C,
+        lamb=lamb,
+        solver=solver,
+        sample_weight=sample_weight,
+    )
+
+
+def _evaluate_center(center_idx, tol=None, time_limit=None):
+    """
+    Solves Q_k for one candidate center over the shared active sets (inexactly
+    with a relaxed tol, bounded by time_limit seconds).
+
+    Returns:
+        Tuple (center_idx, params, removed_count); params is None on failure. The
+        count is a total weight when the fit uses sample weights.
+    """
+    X = _worker_state["X"]
+    sample_weight = _worker_state["sample_weight"]
+    masks = _worker_state["masks"]
+    A_indices = np.flatnonzero(masks[0])
+    B_indices = np.flatnonzero(masks[1])
+    center = X[center_idx]
+
+    params = solve_subproblem_qk(
+        A_indices,
+        B_indices,
+        X,
+        X,
+        center,
+        _worker_state["C"],
+        _worker_state["lamb"],
+        solver=_worker_state["solver"],
+        sample_weight=sample_weight,
+        tol=tol,
+        time_limit=time_limit,
+    )
+    if params is None:
+        return center_idx, None, 0
+
+    # Correctly classified A (removed) are those with g(a) <= 0
+    diff, l1_norm = qk_blocks(A_indices, X, center)
+    g_vals = diff @ params["w"] + params["xi"] * l1_norm - params["gamma"]
+    if sample_weight is not None:
+        return center_idx, params, float(sample_weight[A_indices[g_vals <= 0]].sum())
+    return center_idx, params, int(np.sum(g_vals <= 0))
+
+
+def _evaluate_task(center_idx, tol=None, time_limit=None):
+    """
+    Runs _evaluate_center and returns (result, stats) with the worker's solve
+    statistics of this task, which the parent adds to its own.
+    """
+    environment = get_environment()
+    environment.reset_stats()
+    result = _evaluate_center(center_idx, tol, time_limit)
+    return result, dict(environment.stats)
+
+
+def _shared_copy(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, view
+
+
+def _relay(future, task):
+    # Runs in the executor's thread once the worker task is done
+    if task.cancelled():
+        future.cancel()
+        return
+    if task.exception() is None:
+        result, stats = task.result()
+        # Counted even when the caller no longer wants the result
+        get_environment().merge(stats)
+    if not future.set_running_or_notify_cancel():
+        return
+    if task.exception() is not None:
+        future.set_exception(task.exception())
+        return
+    future.set_result(result)
+
+
+class CandidatePool:
+    """
+    Persistent worker pool bound to one training matrix.
+
+    Args:
+        X: Training matrix (copied once into shared memory)
+        C, lamb: Q_k hyperparameters
+        solver: Q_k backend name used by the workers
+        n_jobs: Number of worker processes (-1 for all cores)
+        sample_weight: Optional per-row weights of X, sent once to every worker
+    """
+
+    def __init__(self, X, C, lamb, solver="gurobi", n_jobs=-1, sample_weight=None):
+        if n_jobs is None or n_jobs < 1:
+            n_jobs = os.cpu_count() or 1
+        self.n_jobs = n_jobs
+
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        self._x_shm, _ = _shared_copy(X)
+        self._mask_shm, self.masks = _shared_copy(np.zeros((2, len(X)), dtype=bool))
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                (self._x_shm.name, X.shape, X.dtype),
+                (self._mask_shm.name, self.masks.shape, self.masks.dtype),
+                C,
+                lamb,
+                solver,
+                sample_weight,
+                worker_settings(n_jobs),
+            ),
+        )
+        self._futures = []
+
+    def drain(self):
+        """
+        Waits for the tasks submitted since the last drain.
+
+        Returns:
+            Counter of the tasks that ran to completion per submit tag;
+            cancelled tasks never ran and are not counted.
+        """
+        tasks, self._futures = self._futures, []
+        wait([task for task, _ in tasks])
+        return Counter(
+            tag
+            for task, tag in tasks
+            if not task.cancelled() and task.exception() is None
+        )
+
+    def set_active(self, A_indices, B_indices):
+        """
+        Publishes the active sets that the next tasks will solve over.
+        Waits for tasks still running on the previous sets first.
+        """
+        self.drain()
+        self.masks[:] = False
+        self.masks[0, np.asarray(A_indices, dtype=np.intp)] = True
+        self.masks[1, np.asarray(B_indices, dtype=np.intp)] = True
+
+    def submit(self, center_idx, tol=None, time_limit=None, tag=None):
+        """
+        Schedules a candidate; the future yields (center_idx, params, removed_count).
+        tag labels the task in the counts returned by drain().
+        """
+        task = self._executor.submit(_evaluate_task, int(center_idx), tol, time_limit)
+        self._futures.append((task, tag))
+        # The caller's future only carries the result; cancelling it also drops
+        # the task if it has not started yet
+        future = Future()
+        future.add_done_callback(lambda f: f.cancelled() and task.cancel())
+        task.add_done_callback(partial(_relay, future))
+        return future
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.masks = None  # Release the buffer export before closing
+        for shm in (self._x_shm, self._mask_shm):
+            shm.close()
+            shm.unlink()
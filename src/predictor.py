@@ -0,0 +1,255 @@
+"""
+Batch Prediction Module.
+
+Compiles the conic functions learned by RPCF into contiguous arrays and scores
+inputs in fixed-size row chunks, so memory stays bounded by the chunk size
+instead of growing with n x k. The streaming helpers extend this to inputs that
+do not fit in memory (chunk iterators and memory-mapped feature files).
+
+When xi_k > ||w_k||_inf the region g_k(x) <= 0 lies inside an L1 ball around
+the cone's center (see bounding_radii). predict looks these cones up through a
+ConeIndex over the balls and only evaluates the cones whose ball holds a row;
+unbounded cones are still scanned for every row.
+"""
+
+import os
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+# Rows per chunk; the temporaries are (CHUNK_SIZE x d) and (CHUNK_SIZE x k)
+CHUNK_SIZE = 8192
+# Fewer bounded cones than this are cheaper to scan than to look up
+INDEX_MIN_CONES = 64
+# Widest bounded cones that are scanned anyway; they cover most rows cheaply
+SCAN_CONES = 8
+
+
+def open_features(path, n_features=None, dtype="float32"):
+    """
+    Opens a feature file as a read-only memory map without loading it.
+
+    Args:
+        path: A .npy file, or a raw row-major binary file of the given dtype
+        n_features: Number of columns, required for raw files
+        dtype: Element type of a raw file
+
+    Returns:
+        np.memmap of shape (n_samples, n_features)
+    """
+    if str(path).endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if n_features is None:
+        raise ValueError("n_features is required for raw feature files")
+    itemsize = np.dtype(dtype).itemsize
+    n_samples = os.path.getsize(path) // (itemsize * n_features)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(n_samples, n_features))
+
+
+def bounding_radii(W, xi, gamma):
+    """
+    L1 radius of a ball around each center that holds the cone's region
+    g_k(x) <= 0, or inf for an unbounded cone.
+
+    Since w'(x-a) >= -||w||_inf * ||x-a||_1, g_k(x) <= 0 implies
+    ||x-a||_1 <= gamma / (xi - ||w||_inf) whenever xi > ||w||_inf.
+    """
+    slope = xi - np.abs(W).max(axis=1, initial=0.0)
+    radii = np.full(len(xi), np.inf)
+    bounded = slope > 0
+    radii[bounded] = np.maximum(gamma[bounded], 0.0) / slope[bounded]
+    # Widened a little so rounding never drops a cone at its boundary
+    return radii * (1 + 1e-9) + 1e-12
+
+
+class ConeIndex:
+    """
+    Ball trees (manhattan metric) over the centers of bounded cones.
+
+    Cones are bucketed by radius in powers of two and every bucket is queried
+    at its largest radius, so a query reaches at most twice as far as needed
+    before the exact per-cone radius check.
+
+    Args:
+        centers: (k x d) cone centers
+        radii: Bounding L1 radii (all finite)
+        cones: Cone number of every row of centers
+    """
+
+    def __init__(self, centers, radii, cones):
+        self.groups = []
+        bucket = np.floor(np.log2(np.maximum(radii, 1e-300)))
+        for b in np.unique(bucket):
+            members = np.flatnonzero(bucket == b)
+            tree = BallTree(centers[members], metric="manhattan")
+            self.groups.append((tree, cones[members], radii[members]))
+
+    def candidates(self, X):
+        """
+        Returns (rows, cones): every pair with ||x_row - a_cone||_1 <= r_cone.
+        """
+        rows, cones = [], []
+        for tree, members, radii in self.groups:
+            ind, dist = tree.query_radius(X, r=radii.max(), return_distance=True)
+            counts = np.fromiter(map(len, ind), dtype=np.intp, count=len(X))
+            if counts.sum() == 0:
+                continue
+            ind = np.concatenate(ind)
+            keep = np.concatenate(dist) <= radii[ind]
+            rows.append(np.repeat(np.arange(len(X)), counts)[keep])
+            cones.append(members[ind[keep]])
+        if not rows:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(rows), np.concatenate(cones)
+
+
+def iter_chunks(X, chunk_size=CHUNK_SIZE):
+    """
+    Yields consecutive row blocks of an array or memory map.
+    """
+    for start in range(0, len(X), chunk_size):
+        yield X[start : start + chunk_size]
+
+
+class ConePredictor:
+    """
+    Stacked representation of a list of conic functions
+    g_k(x) = w_k'(x-a_k) + xi_k*||x-a_k||_1 - gamma_k.
+
+    Args:
+        functions: List of dicts with keys w, xi, gamma, center (RPCF.functions)
+        chunk_size: Number of rows scored at a time
+        use_index: Look bounded cones up through a ConeIndex in predict (only
+            used when at least INDEX_MIN_CONES bounded cones are left after
+            the SCAN_CONES widest)
+    """
+
+    def __init__(self, functions, chunk_size=CHUNK_SIZE, use_index=True):
+        self.centers = np.ascontiguousarray([f["center"] for f in functions], float)
+        self.W = np.ascontiguousarray([f["w"] for f in functions], float)
+        self.xi = np.array([f["xi"] for f in functions], dtype=float)
+        self.gamma = np.array([f["gamma"] for f in functions], dtype=float)
+        # w_k'(x-a_k) - gamma_k = x'w_k - (w_k'a_k + gamma_k)
+        self.offset = np.einsum("kd,kd->k", self.W, self.centers) + self.gamma
+        self.chunk_size = chunk_size
+
+        self.radii = bounding_radii(self.W.reshape(len(self), -1), self.xi, self.gamma)
+        # Cones by decreasing radius: unbounded, the SCAN_CONES widest, the rest
+        order = np.argsort(-self.radii, kind="stable")
+        n_scanned = np.count_nonzero(~np.isfinite(self.radii)) + SCAN_CONES
+        self.index = None
+        self.scanned = np.arange(len(self))
+        if use_index and len(self) - n_scanned >= INDEX_MIN_CONES:
+            indexed = order[n_scanned:]
+            self.index = ConeIndex(self.centers[indexed], self.radii[indexed], indexed)
+            self.scanned = np.sort(order[:n_scanned])
+
+    def __len__(self):
+        return len(self.gamma)
+
+    def _min_g_chunk(self, X_chunk, early_exit, cones=None):
+        if cones is None:
+            if early_exit and self.index is not None:
+                return self._min_g_indexed(X_chunk)
+            cones = np.arange(len(self))
+        # Linear part of every cone at once, then the L1 part cone by cone
+        lin = X_chunk @ self.W[cones].T - self.offset[cones]
+        g_min = np.full(len(X_chunk), np.inf)
+        rows = np.arange(len(X_chunk))
+        for j, k in enumerate(cones):
+            diff = X_chunk[rows] - self.centers[k]
+            g_k = lin[rows, j] + self.xi[k] * np.abs(diff, out=diff).sum(axis=1)
+            g_min[rows] = np.minimum(g_min[rows], g_k)
+            if early_exit:
+                # Rows already inside a cone are classified, skip them
+                rows = rows[g_k > 0]
+                if len(rows) == 0:
+                    break
+        return g_min
+
+    def _min_g_indexed(self, X_chunk):
+        # Unbounded cones can hold any row, so they are scanned first together
+        # with the widest bounded ones
+        g_min = self._min_g_chunk(X_chunk, True, self.scanned)
+        rows = np.flatnonzero(g_min > 0)
+        if len(rows) == 0:
+            return g_min
+        # The remaining rows only meet the bounded cones whose ball holds them
+        pair_rows, pair_cones = self.index.candidates(X_chunk[rows])
+        if len(pair_rows):
+            X_pairs = X_chunk[rows[pair_rows]]
+            lin = np.einsum("pd,pd->p", X_pairs, self.W[pair_cones])
+            diff = X_pairs - self.centers[pair_cones]
+            g_pairs = (
+                lin
+                - self.offset[pair_cones]
+                + self.xi[pair_cones] * np.abs(diff, out=diff).sum(axis=1)
+            )
+            np.minimum.at(g_min, rows[pair_rows], g_pairs)
+        return g_min
+
+    def _min_g(self, X, early_exit):
+        X = np.asarray(X, dtype=float)
+        g_min = np.empty(len(X))
+        for start in range(0, len(X), self.chunk_size):
+            stop = start + self.chunk_size
+            g_min[start:stop] = self._min_g_chunk(X[start:stop], early_exit)
+        return g_min
+
+    def decision_function(self, X):
+        """
+        Returns min_k g_k(x) for every row; <= 0 means class -1.
+        """
+        return self._min_g(X, early_exit=False)
+
+    def predict(self, X):
+        """
+        Classifies as -1 if min(g) <= 0, else 1.
+        """
+        # With early exit g_min is only exact in sign, which is all we need
+        return np.where(self._min_g(X, early_exit=True) <= 0, -1, 1)
+
+    def predict_stream(self, chunks, scaler=None):
+        """
+        Yields the predictions of each chunk of an iterable of row blocks.
+
+        Args:
+            chunks: Iterable of (rows x d) arrays, e.g. iter_chunks(memmap)
+            scaler: Fitted transformer applied to every chunk (training scaling)
+        """
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=float)
+            if scaler is not None:
+                chunk = scaler.transform(chunk)
+            yield self.predict(chunk)
+
+    def predict_file(
+        self, path, out_path=None, scaler=None, n_features=None, dtype="float32"
+    ):
+        """
+        Scores a feature file chunk by chunk.
+
+        Args:
+            path: Input file, see open_features
+            out_path: Optional .npy path; predictions are written to it through a
+                memory map instead of being collected in RAM
+            scaler: Fitted transformer applied to every chunk
+            n_features, dtype: Layout of a raw input file
+
+        Returns:
+            Array (or memory map, when out_path is given) of labels in {-1, 1}
+        """
+        X = open_features(path, n_features=n_features, dtype=dtype)
+        if out_path is None:
+            out = np.empty(len(X), dtype=np.int8)
+        else:
+            out = np.lib.format.open_memmap(
+                out_path, mode="w+", dtype=np.int8, shape=(len(X),)
+            )
+        start = 0
+        for labels in self.predict_stream(iter_chunks(X, self.chunk_size), scaler):
+            out[start : start + len(labels)] = labels
+            start += len(labels)
+        if out_path is not None:
+            out.flush()
+        return out
@@ -1,5 +1,17 @@
+import time
+
 import numpy as np
-from src.solvers import solve_subproblem_qk
+
+from src.active_set import ActiveSet, grow
+from src.checkpoint import data_fingerprint, read_checkpoint, write_checkpoint
+from src.coreset import build_coreset
+from src.model_io import load_model, save_model
+from src.predictor import ConePredictor
+from src.solvers import make_session, solve_subproblem_qk
+from src.tracing import NULL_TRACER
+
+# Consecutive centers without progress after which fit gives up
+MAX_STALLS = 10
 
 
 class RPCF:
@@ -10,15 +22,75 @@ class RPCF:
     polyhedral conic functions to separate class -1 (Set A) from class +1 (Set B).
     It uses a "cookie-cutter" approach where correctly classified points from A are
     removed in each iteration until A is empty (or max iterations reached).
+
+    With coreset_size, inputs larger than that are first compressed into a
+    weighted coreset (see src.coreset) and the cones are fitted on it; the
+    model is then checked on the full data and the result kept in
+    coreset_report.
+
+    fit can be bounded with max_functions (number of cones), time_budget (wall
+    clock seconds, also capping each solve) and solver_time_limit (seconds per
+    Q_k solve, Gurobi TimeLimit). A cone that fails to solve or covers fewer
+    than min_removed active A points is discarded and a random fallback
+    center is tried instead; after MAX_STALLS of those in a row fit stops.
+    When fit stops early, the cones learned so far form a usable partial
+    model; stop_reason tells why fit ended.
+
+    fit(..., checkpoint_path=path) writes the cones, active sets and RNG state
+    (plus the VNS cache) atomically after every cone, and
+    fit(..., resume_from=path) continues such a run on the same data.
     """
 
-    def __init__(self, C=1.0, lamb=0.01):
+    def __init__(
+        self,
+        C=1.0,
+        lamb=0.01,
+        solver="gurobi",
+        coreset_size=None,
+        coreset_method="kmeans",
+        max_functions=None,
+        time_budget=None,
+        min_removed=1,
+        solver_time_limit=None,
+    ):
         self.C = C
         self.lamb = lamb
+        self.solver = solver  # Q_k backend name in src.solvers.SOLVERS
+        self.coreset_size = coreset_size
+        self.coreset_method = coreset_method
+        self.coreset_indices = None  # Rows of the last fit's X kept in the coreset
+        self.coreset_report = None  # Full-data coverage of the last coreset fit
+        self.y_full = None  # Labels of the last training set (for partial_fit)
+        self._buffers = None  # Growable (X, y, weights) storage of partial_fit
+        self.train_accuracy = None  # Training-set accuracy of the last fit
+        self.max_functions = max_functions
+        self.time_budget = time_budget
+        self.min_removed = min_removed
+        self.solver_time_limit = solver_time_limit
+        # "converged", "max_functions", "time_budget" or "stalled"
+        self.stop_reason = None
+        self._deadline = None
         self.functions = []  # List of learned conic functions
         self.centers = []
         self.A_full = None
         self.B_full = None
+        self.session = None  # Persistent Q_k model, alive only during fit
+        self.active = None  # ActiveSet of the last fit (masks and min-g cache)
+        self.scaler = None  # Optional fitted input scaler used by predict_stream/file
+        self.center_order = None  # Optional fixed center sequence (indices into X)
+        # Source of the random centers; np.random (global state) unless a
+        # np.random.RandomState is attached
+        self.rng = np.random
+        # Path mode: warm_starts holds [(center_idx, start)] of a previous fit (or
+        # []) and each iteration's own start is then recorded in self.starts
+        self.warm_starts = None
+        self.starts = []
+        # Path mode: with keep_session, fit resets a session left in
+        # self.session by the previous fit instead of building one, and leaves
+        # its own open; the caller disposes it
+        self.keep_session = False
+        self.tracer = NULL_TRACER  # Profiling hooks, see src.tracing
+        self._predictor = None  # ConePredictor compiled from self.functions
 
     def _evaluate_g(self, X, w, xi, gamma, center):
         """
@@ -30,64 +102,663 @@ class RPCF:
         term2 = xi * np.sum(np.abs(diff), axis=1)
         return term1 + term2 - gamma
 
-    def fit(self, X, y):
-        # Split into A (Class -1) and B (Class 1)
-        # We store indices relative to the FULL X
-        A_indices = np.where(y == -1)[0].tolist()
-        B_indices = np.where(y == 1)[0].tolist()
+    def _use_coreset(self, X, sample_weight):
+        # Explicit sample weights (e.g. of a coreset already) are fitted as given
+        return (
+            self.coreset_size is not None
+            and sample_weight is None
+            and len(X) > self.coreset_size
+        )
+
+    def _fit_coreset(self, X, y, checkpoint_path=None, resume_from=None):
+        """
+        Fits on a weighted coreset of (X, y) and evaluates on all of it.
+        """
+        indices, weights = build_coreset(
+            X, y, self.coreset_size, method=self.coreset_method
+        )
+        print(f"Coreset: {len(indices)} of {len(X)} points ({self.coreset_method})")
+        self.fit(
+            X[indices],
+            y[indices],
+            sample_weight=weights,
+            checkpoint_path=checkpoint_path,
+            resume_from=resume_from,
+        )
+        self.coreset_indices = indices
+        self.coreset_report = self.coverage_report(X, y)
+        print(
+            f"Full data: accuracy {self.coreset_report['accuracy']:.4f}, "
+            f"A covered {self.coreset_report['coverage_A']:.4f}, "
+            f"B outside {self.coreset_report['coverage_B']:.4f}"
+        )
+
+    def coverage_report(self, X, y):
+        """
+        Checks the learned cones on (X, y).
+
+        On the training set itself the labels come from the active set's min-g
+        cache (ActiveSet.predict) instead of another pass over the cones.
+
+        Returns:
+            dict with n_points, accuracy, coverage_A (share of class -1 points
+            inside some cone) and coverage_B (share of class +1 points outside
+            all cones).
+        """
+        if self.active is not None and X is self.active.X:
+            y_pred = self.active.predict()
+        else:
+            y_pred = self.predict(X)
+        in_A = y == -1
+        hit = y_pred == y
+        return {
+            "n_points": len(X),
+            "accuracy": float(np.mean(hit)),
+            "coverage_A": float(np.mean(hit[in_A])) if in_A.any() else 1.0,
+            "coverage_B": float(np.mean(hit[~in_A])) if not in_A.all() else 1.0,
+        }
+
+    def fit(self, X, y, sample_weight=None, checkpoint_path=None, resume_from=None):
+        """
+        Learns the cones on (X, y) with labels in {-1, 1}.
+
+        Args:
+            X, y: Training data
+            sample_weight: Optional per-row weights (e.g. coreset multiplicities)
+                that scale the Q_k slack weights
+            checkpoint_path: Optional file rewritten after every cone
+            resume_from: Checkpoint of an interrupted fit on the same data
+        """
+        # A refit starts from no cones (resume_from restores its own)
+        self.functions = []
+        self.centers = []
+        self._predictor = None
+        self._buffers = None
+        # The tracer writes its records when the fit ends, also on an error
+        with self.tracer:
+            if self._use_coreset(X, sample_weight):
+                self._fit_coreset(X, y, checkpoint_path, resume_from)
+                return
 
+            # Split into A (Class -1) and B (Class 1)
+            # We store indices relative to the FULL X
+            self.active = ActiveSet(
+                X,
+                np.where(y == -1)[0],
+                np.where(y == 1)[0],
+                sample_weight=sample_weight,
+            )
+            self.y_full = y
+            self._grow(X, sample_weight, checkpoint_path, resume_from)
+
+    def _grow(self, X, sample_weight=None, checkpoint_path=None, resume_from=None):
+        """
+        Runs the cookie-cutter loop on X from the sets in self.active, adding
+        cones to self.functions until no active A point is left.
+        """
         self.A_full = X
         self.B_full = X
 
+        self.starts = []
+        self._order_pos = 0
+        rejected = set()  # Centers that made no progress on the current sets
+        iteration = 0
+
+        fingerprint = None
+        if checkpoint_path is not None or resume_from is not None:
+            fingerprint = data_fingerprint(X, self.y_full)
+        if resume_from is not None:
+            iteration = self._restore_checkpoint(resume_from, fingerprint)
+
         # Iteratively separate class A from class B.
         # Ideally, we want to find a set of cones whose intersection classifies B correctly
         # and excludes A. In the constructive approach, we remove points from A that are
         # "cut" (correctly classified as outside the current cone) in each step.
 
-        iteration = 0
-        while len(A_indices) > 0:
+        # One persistent Q_k model for the whole fit; it is updated in place as
+        # the center changes and points are pruned.
+        with self.tracer.span("session_build", n_A=len(self.active.A_indices)):
+            if self.keep_session and self.session is not None:
+                self.session.reset(
+                    self.active.A_indices, self.active.B_indices, self.C, self.lamb
+                )
+            else:
+                self.session = make_session(
+                    X,
+                    self.active.A_indices,
+                    self.active.B_indices,
+                    self.C,
+                    self.lamb,
+                    solver=self.solver,
+                    sample_weight=sample_weight,
+                )
+
+        self.stop_reason = "converged"
+        if self.time_budget is not None:
+            self._deadline = time.monotonic() + self.time_budget
+
+        while len(self.active.A_indices) > 0:
+            if (
+                self.max_functions is not None
+                and len(self.functions) >= self.max_functions
+            ):
+                self.stop_reason = "max_functions"
+                break
+            if self._time_left() <= 0:
+                self.stop_reason = "time_budget"
+                break
             iteration += 1
 
-            self.current_A_indices = A_indices
-            self.current_B_indices = B_indices
-            center_idx = self.select_center(A_indices)
+            self.current_A_indices = self.active.A_indices
+            self.current_B_indices = self.active.B_indices
+            with self.tracer.span("select_center", iteration=iteration):
+                if rejected:
+                    center_idx = self._fallback_center(rejected)
+                else:
+                    center_idx = self.select_center(self.active.A_indices)
+            if center_idx is None:
+                self.stop_reason = "stalled"
+                break
             center_a = X[center_idx]
 
-            params = solve_subproblem_qk(
-                A_indices, B_indices, X, X, center_a, self.C, self.lamb
-            )
+            # Warm start from the same iteration of a previous fit (path mode)
+            if self.warm_starts and iteration <= len(self.warm_starts):
+                start_center, start = self.warm_starts[iteration - 1]
+                if start_center == center_idx:
+                    self.session.set_start(start)
 
-            if params is None:
-                print("Solver failed. Break.")
-                break
+            params = self._solve_center(center_idx)
+
+            # The center itself always has g = -gamma < 0, so any solved cone
+            # removes at least one point; min_removed > 1 needs an explicit
+            # count, capped by what is left so the last points can be covered
+            if params is None or (
+                self.min_removed > 1
+                and self.active.count_covered(
+                    params["w"], params["xi"], params["gamma"], center_a
+                )
+                < min(self.min_removed, self.active.remaining())
+            ):
+                rejected.add(int(center_idx))
+                print(f"Iter {iteration}: No progress at center {center_idx}.")
+                if len(rejected) >= MAX_STALLS:
+                    self.stop_reason = "stalled"
+                    break
+                continue
+            rejected.clear()
+
+            if self.warm_starts is not None:
+                self.starts.append((center_idx, self.session.get_start()))
 
             # Store Model
             model_dict = {**params, "center": center_a}
             self.functions.append(model_dict)
             self.centers.append(center_a)
 
-            # Evaluate to prune datasets
-            # For A: Keep points where g(a) > 0 (Misclassified/Not covered)
-            g_vals_A = self._evaluate_g(
-                X[A_indices], params["w"], params["xi"], params["gamma"], center_a
-            )
-            keep_mask_A = g_vals_A > 0
-            A_indices = np.array(A_indices)[keep_mask_A].tolist()
+            # Prune: keep A points with g(a) > 0 (not covered yet) and
+            # B points with g(b) > 0 (correctly classified)
+            with self.tracer.span("prune", iteration=iteration):
+                A_removed, B_removed = self.active.add_cone(
+                    params["w"], params["xi"], params["gamma"], center_a
+                )
+                self.session.remove_points(A_removed, B_removed)
 
-            # For B: Keep points where g(b) > 0 (Correctly classified)
-            g_vals_B = self._evaluate_g(
-                X[B_indices], params["w"], params["xi"], params["gamma"], center_a
+            if self.tracer.enabled:
+                self.tracer.event(
+                    "cone",
+                    iteration=iteration,
+                    center=int(center_idx),
+                    A_removed=len(A_removed),
+                    B_removed=len(B_removed),
+                    cache_hits=getattr(self, "cache_hits", None),
+                    cache_misses=getattr(self, "cache_misses", None),
+                )
+
+            print(
+                f"Iter {iteration}: Remaining A: {len(self.active.A_indices)}, "
+                f"B: {len(self.active.B_indices)}"
             )
-            keep_mask_B = g_vals_B > 0
-            B_indices = np.array(B_indices)[keep_mask_B].tolist()
+            if checkpoint_path is not None:
+                self._write_checkpoint(checkpoint_path, fingerprint, iteration)
 
+        if self.stop_reason != "converged":
             print(
-                f"Iter {iteration}: Remaining A: {len(A_indices)}, B: {len(B_indices)}"
+                f"Stopped early ({self.stop_reason}) with {len(self.functions)} "
+                f"functions, remaining A: {len(self.active.A_indices)}"
+            )
+        self._deadline = None
+        if not self.keep_session:
+            self.session.dispose()
+            self.session = None
+        self._compile_predictor()
+        self.train_accuracy = self.coverage_report(X, self.y_full)["accuracy"]
+
+    def _cone_values(self, X, cones=None):
+        """
+        g_k(x) of the given cones (default: all) for every row, shape (k, n).
+        """
+        cones = range(len(self.functions)) if cones is None else cones
+        return np.array(
+            [
+                self._evaluate_g(X, f["w"], f["xi"], f["gamma"], f["center"])
+                for f in (self.functions[k] for k in cones)
+            ]
+        ).reshape(len(cones), len(X))
+
+    def _append_rows(self, X_new, y_new, sample_weight=None):
+        """
+        Appends a batch to the stored training set. The rows live in buffers
+        that double when full, so a batch costs O(batch) amortized instead of
+        a copy of the whole history.
+
+        Returns:
+            Tuple (X, y, weights) of the grown training set; weights is None
+            unless the model or the batch is weighted.
+        """
+        if self.active is None or self.y_full is None:
+            # A loaded model has no training set; start one from the batch
+            self.active = ActiveSet(np.empty((0, X_new.shape[1])), [], [])
+            self.active.n_cones = len(self.functions)
+            self.A_full, self.y_full = self.active.X, np.empty(0, y_new.dtype)
+            self._buffers = None
+        if self._buffers is None:
+            # The first batch copies the caller's arrays into owned buffers
+            X_old = self.A_full.astype(np.result_type(self.A_full, X_new), copy=False)
+            self._buffers = (X_old, self.y_full, self.active.sample_weight)
+        X_buf, y_buf, w_buf = self._buffers
+        n_old = len(self.y_full)
+        n = n_old + len(X_new)
+        X_buf, y_buf = grow(X_buf, n), grow(y_buf, n)
+        X_buf[n_old:n] = X_new
+        y_buf[n_old:n] = y_new
+        if w_buf is not None or sample_weight is not None:
+            if w_buf is None:
+                w_buf = np.ones(n_old)
+            w_buf = grow(w_buf, n)
+            w_buf[n_old:n] = 1.0 if sample_weight is None else sample_weight
+        self._buffers = (X_buf, y_buf, w_buf)
+        return X_buf[:n], y_buf[:n], None if w_buf is None else w_buf[:n]
+
+    def _recheck(self, indices, cones=None):
+        """
+        Evaluates cones (default: all) on training points and records their
+        new min_g and covering cone in the active set. With a subset of cones
+        the points must be uncovered so far; the other cones stay outside.
+        """
+        if len(indices) == 0:
+            return
+        cones = np.arange(len(self.functions)) if cones is None else np.asarray(cones)
+        g = self._cone_values(self.A_full[indices], cones)
+        nearest = g.argmin(axis=0)
+        min_g = g[nearest, np.arange(len(indices))]
+        if len(cones) < len(self.functions):
+            min_g = np.minimum(min_g, self.active.min_g[indices])
+        cone_of = np.where(min_g <= 0, cones[nearest], -1)
+        self.active.update(indices, min_g, cone_of, self.y_full[indices] == -1)
+
+    def partial_fit(self, X_new, y_new, sample_weight=None):
+        """
+        Updates the model with a new labeled batch instead of refitting.
+
+        New A points inside an existing cone are already classified. Cones that
+        now contain new B points are re-solved at their center, over the A
+        points assigned to them and the active B points. The A points left
+        uncovered (new ones, any released by a refit and those an early stop
+        left) then go through the usual cookie-cutter loop, against the old
+        active B points plus the new ones that lie outside all cones.
+
+        The active set records a covering cone for every point, so only the
+        batch, the points of the refitted cones and the active points are
+        evaluated, and the training set grows in place: the cost follows the
+        size of the update. A model loaded from disk has no training set; its
+        cones are then updated from the new batch alone.
+
+        Args:
+            X_new, y_new: New training data (labels in {-1, 1})
+            sample_weight: Optional weights of the batch; a weighted model
+                gives unweighted batches weight 1
+        """
+        X_new, y_new = np.asarray(X_new), np.asarray(y_new)
+        if not self.functions:
+            self.fit(X_new, y_new, sample_weight=sample_weight)
+            return
+        if self.active is not None and self.active.n_cones != len(self.functions):
+            raise ValueError(
+                f"active set numbers {self.active.n_cones} cones but the model "
+                f"has {len(self.functions)}; refit or compact() the model"
             )
 
+        n_old = 0 if self.y_full is None else len(self.y_full)
+        X, y, weights = self._append_rows(X_new, y_new, sample_weight)
+        self.A_full = self.B_full = X
+        self.y_full = y
+        new_A = n_old + np.flatnonzero(y_new == -1)
+        new_B = n_old + np.flatnonzero(y_new == 1)
+        self.active.extend(X, new_A, new_B, weights)
+        self._recheck(np.arange(n_old, len(X)))
+
+        # Cones that contain a new B point (g <= 0) are refitted
+        affected = np.unique(self.active.cone_of[new_B])
+        affected = affected[affected >= 0]
+        B_indices = np.union1d(self.active.B_indices, new_B)
+        refitted = []
+        for k in affected:
+            f = self.functions[k]
+            points = self.active.covered_by([k])
+            params = solve_subproblem_qk(
+                points[y[points] == -1],
+                B_indices,
+                X,
+                X,
+                f["center"],
+                self.C,
+                self.lamb,
+                solver=self.solver,
+                sample_weight=weights,
+            )
+            if params is not None:
+                self.functions[k] = {**params, "center": f["center"]}
+                self.centers[k] = f["center"]
+                self._predictor = None
+                refitted.append(k)
+
+        if refitted:
+            # Points of the refitted cones look for another cone; the
+            # uncovered ones may now lie inside a refitted cone
+            self._recheck(self.active.covered_by(refitted))
+            uncovered = np.concatenate([self.active.A_indices, self.active.B_indices])
+            self._recheck(uncovered, refitted)
+
+        print(
+            f"partial_fit: {len(X_new)} new points, {len(refitted)} cones "
+            f"refitted, A to cover: {len(self.active.A_indices)}"
+        )
+        if len(self.active.A_indices) == 0:
+            self._compile_predictor()
+            self.train_accuracy = self.coverage_report(X, y)["accuracy"]
+            return
+        with self.tracer:
+            self._grow(X, weights)
+
+    def compact(self, X=None, y=None, min_gain=1, resolve=False):
+        """
+        Drops redundant cones by a greedy set cover of the training points.
+
+        Starting from no cones, the cone with the largest gain (A points it
+        newly covers minus B points it newly puts inside a cone) is kept until
+        no remaining cone gains min_gain or more; kept cones stay in their fit
+        order. With resolve=True every kept cone is then re-solved at its
+        center over the A points assigned to it and all B points, which lets
+        it absorb the margins of the dropped cones.
+
+        Args:
+            X, y: Points to cover (default: the stored training set)
+            min_gain: Smallest gain for which a cone is kept
+            resolve: Re-solve Q_k for the kept cones
+
+        Returns:
+            dict with n_functions_before, n_functions, accuracy_before,
+            accuracy, and path: (n_functions, accuracy) after every greedy pick.
+        """
+        stored = X is None
+        if stored:
+            if self.active is None or self.y_full is None:
+                raise ValueError(
+                    "compact() needs X, y for a model without training data"
+                )
+            X, y, sample_weight = self.A_full, self.y_full, self.active.sample_weight
+        else:
+            sample_weight = None
+        weight = np.ones(len(X)) if sample_weight is None else sample_weight
+        k = len(self.functions)
+        inside = self._cone_values(X) <= 0
+        in_A = y == -1
+        gain_A = inside & in_A
+        gain_B = inside & ~in_A
+        total = weight.sum()
+
+        def accuracy(covered):
+            hit = np.where(in_A, covered, ~covered)
+            return float(weight[hit].sum() / total)
+
+        covered = np.zeros(len(X), dtype=bool)
+        accuracy_before = accuracy(inside.any(axis=0))
+        path = [(0, accuracy(covered))]
+        kept, assigned = [], {}
+        remaining = list(range(k))
+        while remaining:
+            new = [gain_A[j] & ~covered for j in remaining]
+            gains = [
+                weight[n].sum() - weight[gain_B[j] & ~covered].sum()
+                for j, n in zip(remaining, new)
+            ]
+            best = int(np.argmax(gains))
+            if gains[best] < min_gain:
+                break
+            j = remaining.pop(best)
+            kept.append(j)
+            assigned[j] = np.flatnonzero(new[best])
+            covered |= inside[j]
+            path.append((len(kept), accuracy(covered)))
+
+        kept.sort()
+        pruned = [self.functions[j] for j in kept]
+        if resolve:
+            all_B = np.flatnonzero(~in_A)
+            for j in kept:
+                f = self.functions[j]
+                params = solve_subproblem_qk(
+                    assigned[j],
+                    all_B,
+                    X,
+                    X,
+                    f["center"],
+                    self.C,
+                    self.lamb,
+                    solver=self.solver,
+                    sample_weight=sample_weight,
+                )
+                if params is not None:
+                    self.functions[j] = {**params, "center": f["center"]}
+        self.functions = [self.functions[j] for j in kept]
+        g = self._cone_values(X)
+        min_g = g.min(axis=0) if len(g) else np.full(len(X), np.inf)
+        if resolve and accuracy(min_g <= 0) < path[-1][1]:
+            # The re-solved cones fit worse than the pruned ones, keep those
+            self.functions = pruned
+            g = self._cone_values(X)
+            min_g = g.min(axis=0) if pruned else min_g
+        self.centers = [f["center"] for f in self.functions]
+        self._compile_predictor()
+        report = {
+            "n_functions_before": k,
+            "n_functions": len(self.functions),
+            "accuracy_before": accuracy_before,
+            "accuracy": accuracy(min_g <= 0),
+            "path": path,
+        }
+        if self.active is not None and self.y_full is not None:
+            # The cones were renumbered: rebuild the active sets of the stored
+            # training set so that a later partial_fit stays consistent
+            if not stored:
+                X, in_A = self.A_full, self.y_full == -1
+                sample_weight = self.active.sample_weight
+                g = self._cone_values(X)
+                min_g = g.min(axis=0) if len(g) else np.full(len(X), np.inf)
+            self.active = ActiveSet(
+                X,
+                np.flatnonzero(in_A & (min_g > 0)),
+                np.flatnonzero(~in_A & (min_g > 0)),
+                sample_weight=sample_weight,
+            )
+            self.active.min_g[:] = min_g
+            if len(g):
+                self.active.cone_of[:] = np.where(min_g <= 0, g.argmin(axis=0), -1)
+            self.active.n_cones = len(self.functions)
+            self.train_accuracy = self.coverage_report(X, self.y_full)["accuracy"]
+        print(
+            f"compact: {k} -> {len(self.functions)} functions, accuracy "
+            f"{report['accuracy_before']:.4f} -> {report['accuracy']:.4f}"
+        )
+        return report
+
+    def _checkpoint_state(self):
+        """
+        Header fields and blocks of a checkpoint; subclasses extend both.
+        """
+        k = len(self.functions)
+        d = self.A_full.shape[1]
+        rng_name, rng_keys, rng_pos, has_gauss, cached_gaussian = self.rng.get_state()
+        header = {
+            "order_pos": int(self._order_pos),
+            "rng": [rng_name, int(rng_pos), int(has_gauss), float(cached_gaussian)],
+        }
+        blocks = {
+            "centers": np.array([f["center"] for f in self.functions], float),
+            "w": np.array([f["w"] for f in self.functions], float),
+            "xi": np.array([f["xi"] for f in self.functions], float),
+            "gamma": np.array([f["gamma"] for f in self.functions], float),
+            "obj": np.array([f.get("obj", np.nan) for f in self.functions], float),
+            "A_mask": np.packbits(self.active.A_mask),
+            "B_mask": np.packbits(self.active.B_mask),
+            "rng_keys": rng_keys,
+        }
+        blocks["centers"] = blocks["centers"].reshape(k, d)
+        blocks["w"] = blocks["w"].reshape(k, d)
+        return header, blocks
+
+    def _restore_state(self, header, arrays):
+        """
+        Applies the state read by _restore_checkpoint; subclasses extend it.
+        """
+        self.functions = [
+            {
+                "w": arrays["w"][i].copy(),
+                "xi": float(arrays["xi"][i]),
+                "gamma": float(arrays["gamma"][i]),
+                "obj": float(arrays["obj"][i]),
+                "center": arrays["centers"][i].copy(),
+            }
+            for i in range(len(arrays["xi"]))
+        ]
+        self.centers = [f["center"] for f in self.functions]
+        self._predictor = None
+        n = len(self.A_full)
+        self.active.restore(
+            np.unpackbits(arrays["A_mask"], count=n).astype(bool),
+            np.unpackbits(arrays["B_mask"], count=n).astype(bool),
+            self.functions,
+        )
+        self._order_pos = header["order_pos"]
+        rng_name, rng_pos, has_gauss, cached_gaussian = header["rng"]
+        self.rng.set_state(
+            (rng_name, arrays["rng_keys"].copy(), rng_pos, has_gauss, cached_gaussian)
+        )
+
+    def _write_checkpoint(self, path, fingerprint, iteration):
+        header, blocks = self._checkpoint_state()
+        header.update(
+            {
+                "class": type(self).__name__,
+                "fingerprint": fingerprint,
+                "iteration": iteration,
+            }
+        )
+        write_checkpoint(path, header, blocks)
+
+    def _restore_checkpoint(self, path, fingerprint):
+        """
+        Loads a checkpoint of this model class and data.
+
+        Returns:
+            The iteration to continue the fit loop from.
+        """
+        header, arrays = read_checkpoint(path)
+        if header["class"] != type(self).__name__:
+            raise TypeError(
+                f"{path} is a {header['class']} checkpoint, not {type(self).__name__}"
+            )
+        if header["fingerprint"] != fingerprint:
+            raise ValueError(f"{path} was written for different training data")
+        self._restore_state(header, arrays)
+        print(
+            f"Resumed from {path}: {len(self.functions)} functions, "
+            f"remaining A: {len(self.active.A_indices)}"
+        )
+        return header["iteration"]
+
+    def _time_left(self):
+        """Seconds left of the fit's time budget (inf without one)."""
+        if self._deadline is None:
+            return np.inf
+        return self._deadline - time.monotonic()
+
+    def _solve_time_limit(self):
+        """
+        Time limit of the next Q_k solve: solver_time_limit, capped by the
+        remaining time budget (None if neither is set).
+        """
+        limit = min(
+            np.inf if self.solver_time_limit is None else self.solver_time_limit,
+            self._time_left(),
+        )
+        return None if limit == np.inf else max(limit, 0.0)
+
+    def _fallback_center(self, rejected):
+        """
+        Random active A point that has not been rejected yet, or None.
+        """
+        candidates = self.active.A_indices[
+            ~np.isin(self.active.A_indices, list(rejected))
+        ]
+        if len(candidates) == 0:
+            return None
+        return self.rng.choice(candidates)
+
+    def _solve_center(self, center_idx):
+        """
+        Solves Q_k for the chosen center over the current active sets.
+        Subclasses may return a result already computed during selection.
+        """
+        with self.tracer.span("solve", center=int(center_idx)) as info:
+            params = self.session.solve(
+                self.A_full[center_idx], time_limit=self._solve_time_limit()
+            )
+            if self.tracer.enabled:
+                info.update(self.session.last_stats or {})
+        return params
+
     def select_center(self, candidates):
+        if self.center_order is not None:
+            # Fixed sequence: first point of center_order that is still active
+            while not self.active.A_mask[self.center_order[self._order_pos]]:
+                self._order_pos += 1
+            return self.center_order[self._order_pos]
+
         # Default r-PCF: Random selection
-        return np.random.choice(candidates)
+        return self.rng.choice(candidates)
+
+    def _compile_predictor(self):
+        # Stacked cones and their bounding-region index, built once per change
+        self._predictor = ConePredictor(self.functions) if self.functions else None
+
+    def cone_predictor(self):
+        """
+        ConePredictor of the learned cones. It is compiled (with its
+        bounding-region index) when fit, partial_fit, compact or load finish,
+        and kept until the cones change again.
+        """
+        if self._predictor is None:
+            self._compile_predictor()
+        return self._predictor
+
+    def decision_function(self, X):
+        """
+        Returns the margin min_k g_k(x) for every row (<= 0 means class -1).
+        """
+        if not self.functions:
+            return np.full(len(X), np.inf)
+        return self.cone_predictor().decision_function(X)
 
     def predict(self, X):
         if not self.functions:
@@ -95,12 +766,40 @@ class RPCF:
 
         # g(x) = min(g_1, g_2, ... g_k)
         # Classify as -1 if min(g) <= 0, else 1
-        g_matrix = np.zeros((len(X), len(self.functions)))
+        return self.cone_predictor().predict(X)
 
-        for k, func in enumerate(self.functions):
-            g_matrix[:, k] = self._evaluate_g(
-                X, func["w"], func["xi"], func["gamma"], func["center"]
-            )
+    def predict_stream(self, chunks):
+        """
+        Yields predictions for an iterable of row chunks, scaling each chunk with
+        self.scaler when one is attached.
+        """
+        return self.cone_predictor().predict_stream(chunks, self.scaler)
+
+    def predict_file(self, path, out_path=None, n_features=None, dtype="float32"):
+        """
+        Predicts a memory-mapped .npy or raw feature file with bounded memory.
+        See ConePredictor.predict_file for the arguments.
+        """
+        return self.cone_predictor().predict_file(
+            path, out_path, self.scaler, n_features=n_features, dtype=dtype
+        )
+
+    def save(self, path):
+        """
+        Saves the learned functions, hyperparameters and scaler to a compact
+        binary file (see src.model_io).
+        """
+        save_model(self, path)
 
-        g_min = np.min(g_matrix, axis=1)
-        return np.where(g_min <= 0, -1, 1)
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a model saved with save(); the parameters are memory-mapped.
+        """
+        model = load_model(path, mmap=mmap)
+        if not isinstance(model, cls):
+            raise TypeError(
+                f"{path} holds a {type(model).__name__}, not {cls.__name__}"
+            )
+        model._compile_predictor()
+        return model
@@ -0,0 +1,136 @@
+"""
+Q_k subproblem solvers.
+
+Every backend exposes the same two entry points:
+
+    solve_subproblem_qk(A_indices, B_indices, A_full, B_full, center_a, C, lamb,
+                        sample_weight=None, tol=None, time_limit=None)
+        One-shot solve, returns {"w", "xi", "gamma", "obj"} or None.
+    Session(X_full, A_indices, B_indices, C, lamb, sample_weight=None)
+        Per-fit state with solve(center_a, tol=None, time_limit=None),
+        remove_points(A_removed, B_removed), reset(A_indices, B_indices, C,
+        lamb) to start over with new hyperparameters, get_start() /
+        set_start(start) for warm starts, and dispose().
+
+Backends are registered by name in SOLVERS ("gurobi" and "native"); RPCF and
+VNS_RPCF select one with their solver= option. Thread budget, parameter preset
+and solve statistics of a process are managed by src.solvers.environment.
+"""
+
+from collections import namedtuple
+
+from src.solvers import gurobi_qp, native_qp
+from src.solvers.common import qk_blocks, slack_weights
+from src.solvers.environment import (
+    PRESETS,
+    SolverEnvironment,
+    configure,
+    get_environment,
+    set_thread_limit,
+    solve_stats,
+    thread_budget,
+    worker_settings,
+)
+from src.solvers.gurobi_qp import GurobiQkSession, build_qk_model
+from src.solvers.native_qp import NativeQkSession, solve_qk_native
+
+SolverBackend = namedtuple("SolverBackend", ["solve_subproblem_qk", "Session"])
+
+SOLVERS = {
+    "gurobi": SolverBackend(gurobi_qp.solve_subproblem_qk, GurobiQkSession),
+    "native": SolverBackend(native_qp.solve_subproblem_qk, NativeQkSession),
+}
+
+
+def get_solver(solver):
+    """
+    Resolves a backend name (or an already built SolverBackend).
+    """
+    if isinstance(solver, SolverBackend):
+        return solver
+    if solver not in SOLVERS:
+        raise ValueError(
+            f"Solver '{solver}' not found. Available: {', '.join(SOLVERS)}"
+        )
+    return SOLVERS[solver]
+
+
+def solve_subproblem_qk(
+    A_indices,
+    B_indices,
+    A_full,
+    B_full,
+    center_a,
+    C,
+    lamb,
+    solver="gurobi",
+    sample_weight=None,
+    tol=None,
+    time_limit=None,
+):
+    """
+    Solves the QP subproblem for a given center with the chosen backend.
+
+    Args:
+        A_indices: Current active indices for Set A (Class -1)
+        B_indices: Current active indices for Set B (Class +1)
+        A_full: Full dataset A (Class -1)
+        B_full: Full dataset B (Class +1)
+        center_a: The chosen center point (from A)
+        C: Hyperparameter for misclassification penalty
+        lamb: Hyperparameter for regularization
+        solver: Backend name in SOLVERS, or a SolverBackend
+        sample_weight: Optional per-point weights over the rows of the full data
+        tol: Relaxed tolerance for a cheaper inexact solve (None: exact)
+        time_limit: Optional solver time limit in seconds
+
+    Returns:
+        Dictionary with optimal parameters w, xi, gamma, obj, or None if failed.
+    """
+    backend = get_solver(solver)
+    return backend.solve_subproblem_qk(
+        A_indices,
+        B_indices,
+        A_full,
+        B_full,
+        center_a,
+        C,
+        lamb,
+        sample_weight=sample_weight,
+        tol=tol,
+        time_limit=time_limit,
+    )
+
+
+def make_session(
+    X_full, A_indices, B_indices, C, lamb, solver="gurobi", sample_weight=None
+):
+    """
+    Creates the per-fit Q_k session of the chosen backend.
+    """
+    return get_solver(solver).Session(
+        X_full, A_indices, B_indices, C, lamb, sample_weight=sample_weight
+    )
+
+
+__all__ = [
+    "PRESETS",
+    "SOLVERS",
+    "GurobiQkSession",
+    "NativeQkSession",
+    "SolverBackend",
+    "SolverEnvironment",
+    "build_qk_model",
+    "configure",
+    "get_environment",
+    "get_solver",
+    "make_session",
+    "qk_blocks",
+    "set_thread_limit",
+    "slack_weights",
+    "solve_qk_native",
+    "solve_stats",
+    "solve_subproblem_qk",
+    "thread_budget",
+    "worker_settings",
+]
@@ -0,0 +1,47 @@
+"""
+Helpers shared by the Q_k solver backends.
+"""
+
+import numpy as np
+
+
+def qk_blocks(indices, X_full, center_a):
+    """
+    Computes the constraint data of Q_k for a block of points in one NumPy pass.
+
+    Args:
+        indices: Active indices into X_full
+        X_full: Full dataset the indices refer to
+        center_a: The chosen center point
+
+    Returns:
+        Tuple (diff, l1_norm) with the difference matrix X[idx] - center_a
+        and its row-wise L1 norms.
+    """
+    diff = X_full[np.asarray(indices, dtype=np.intp)] - center_a
+    l1_norm = np.abs(diff).sum(axis=1)
+    return diff, l1_norm
+
+
+def slack_weights(A_indices, B_indices, C, sample_weight=None):
+    """
+    Per-row slack weights of Q_k: 1/m for A rows and C/p for B rows.
+
+    With sample_weight (one weight per row of the full data, e.g. coreset
+    multiplicities) a point counts sample_weight[i] times: A rows get
+    s_i / sum_A(s) and B rows C * s_j / sum_B(s).
+
+    Returns:
+        Tuple (c_A, c_B) of weight arrays.
+    """
+    m_sub = len(A_indices)
+    p_sub = len(B_indices)
+    if sample_weight is None:
+        c_A = np.full(m_sub, 1.0 / m_sub) if m_sub else np.zeros(0)
+        c_B = np.full(p_sub, C / p_sub) if p_sub else np.zeros(0)
+        return c_A, c_B
+    s_A = sample_weight[np.asarray(A_indices, dtype=np.intp)]
+    s_B = sample_weight[np.asarray(B_indices, dtype=np.intp)]
+    c_A = s_A / s_A.sum() if m_sub else np.zeros(0)
+    c_B = C * s_B / s_B.sum() if p_sub else np.zeros(0)
+    return c_A, c_B
@@ -0,0 +1,206 @@
+"""
+Solver environment manager.
+
+Every Gurobi model of a process is created in one shared gp.Env owned by the
+current SolverEnvironment instead of Gurobi's default environment. The
+environment carries the thread budget of the process and a parameter preset,
+and counts the Q_k solves of both backends.
+
+Worker pools (CandidatePool, the tuning and benchmark pools) call configure()
+in their initializer with worker_settings(n_workers), so concurrent fits
+share the cores instead of each Gurobi instance starting one thread per core.
+"""
+
+import os
+import threading
+
+try:
+    import gurobipy as gp
+except ImportError:
+    gp = None
+
+
+# Gurobi parameters per preset. "barrier" skips crossover, the cheapest way to
+# score a candidate center, but leaves no basis for warm starts; "accurate"
+# tightens the tolerances that inexact solves (tol=) relax.
+PRESETS = {
+    "default": {},
+    "simplex": {"Method": 1},
+    "barrier": {"Method": 2, "Crossover": 0},
+    "accurate": {"OptimalityTol": 1e-8, "FeasibilityTol": 1e-8, "BarConvTol": 1e-10},
+}
+
+# Outcomes counted in the solve statistics
+STATUSES = ("optimal", "time_limit", "failed")
+
+
+def thread_budget(n_workers):
+    """
+    Threads per worker when n_workers processes share the machine (at least 1).
+    """
+    return max(1, (os.cpu_count() or 1) // max(n_workers, 1))
+
+
+class SolverEnvironment:
+    """
+    Shared Gurobi environment with a thread budget, a parameter preset and
+    solve statistics.
+
+    Args:
+        threads: Threads of every model (None: Gurobi's default, all cores)
+        preset: Name in PRESETS
+        params: Extra Gurobi parameters, applied on top of the preset
+    """
+
+    def __init__(self, threads=None, preset="default", params=None):
+        if preset not in PRESETS:
+            raise ValueError(
+                f"Solver preset '{preset}' not found. Available: {', '.join(PRESETS)}"
+            )
+        self.threads = threads
+        self.preset = preset
+        self.extra_params = dict(params or {})
+        self.params = {**PRESETS[preset], **self.extra_params}
+        self._env = None
+        # Pool results are merged from the executor's thread
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def settings(self):
+        """
+        Keyword arguments of configure() that rebuild this environment, e.g. in
+        a worker process.
+        """
+        return {
+            "threads": self.threads,
+            "preset": self.preset,
+            "params": self.extra_params,
+        }
+
+    @property
+    def env(self):
+        # Started on first use, so configuring never needs a license
+        if self._env is None:
+            if gp is None:
+                raise ImportError("gurobipy not installed")
+            env = gp.Env(empty=True)
+            env.setParam("OutputFlag", 0)
+            if self.threads is not None:
+                env.setParam("Threads", self.threads)
+            env.start()
+            self._env = env
+        return self._env
+
+    def new_model(self, name):
+        """
+        Creates a Gurobi model in the shared environment with the preset applied.
+        """
+        model = gp.Model(name, env=self.env)
+        # The model keeps its environment alive after a configure()
+        model._environment = self
+        for param, value in self.params.items():
+            model.setParam(param, value)
+        return model
+
+    def default(self, param, value):
+        """
+        Value of a Gurobi parameter under the preset, or value if it is unset.
+        """
+        return self.params.get(param, value)
+
+    def record(self, runtime, iterations, status):
+        """
+        Adds one solve to the statistics; status is one of STATUSES.
+        """
+        with self._stats_lock:
+            self.stats["solves"] += 1
+            self.stats["runtime"] += runtime
+            self.stats["iterations"] += int(iterations)
+            self.stats[status] += 1
+
+    def merge(self, stats):
+        """
+        Adds the statistics of another environment, e.g. a pool worker's.
+        """
+        with self._stats_lock:
+            for key, value in stats.items():
+                self.stats[key] += value
+
+    def reset_stats(self):
+        stats = {"solves": 0, "runtime": 0.0, "iterations": 0}
+        stats.update({status: 0 for status in STATUSES})
+        self.stats = stats
+
+    def close(self):
+        """
+        Disposes the Gurobi environment; no model created in it may be used
+        afterwards. Unused environments are also released when collected.
+        """
+        if self._env is not None:
+            self._env.dispose()
+            self._env = None
+
+
+# Environment of this process, created on first use
+_current = None
+
+
+def get_environment():
+    """
+    Returns the process's SolverEnvironment (Gurobi defaults until configured).
+    """
+    global _current
+    if _current is None:
+        _current = SolverEnvironment()
+    return _current
+
+
+def configure(threads=None, preset="default", params=None):
+    """
+    Replaces the process's solver environment. Models created afterwards use
+    the new thread budget and preset; the statistics start from zero. Models
+    already built (e.g. a live session) keep the old Gurobi environment, which
+    is released with the last of them.
+
+    Args:
+        threads: Threads of every Gurobi model (None: all cores)
+        preset: Name in PRESETS
+        params: Extra Gurobi parameters
+
+    Returns:
+        The new SolverEnvironment
+    """
+    global _current
+    _current = SolverEnvironment(threads, preset, params)
+    return _current
+
+
+def worker_settings(n_workers):
+    """
+    Keyword arguments of configure() for one of n_workers pool processes:
+    spawned workers do not inherit solver state (e.g. Gurobi environments), so
+    each gets this process's preset and its share of the cores, never more
+    threads than this process is limited to.
+    """
+    settings = get_environment().settings()
+    threads = thread_budget(n_workers)
+    if settings["threads"] is not None:
+        threads = min(threads, settings["threads"])
+    return {**settings, "threads": threads}
+
+
+def set_thread_limit(n_threads):
+    """
+    Caps the threads of every Gurobi model created afterwards in this process,
+    keeping the current preset.
+    """
+    settings = get_environment().settings()
+    configure(**{**settings, "threads": n_threads})
+
+
+def solve_stats():
+    """
+    Statistics of the Q_k solves of this process since the last configure():
+    solves, runtime (seconds), iterations and a count per status.
+    """
+    return dict(get_environment().stats)
@@ -0,0 +1,700 @@
+"""
+Gurobi backend for the Q_k subproblem.
+
+Builds the QP with the Gurobi matrix API, either as a one-shot model
+(solve_subproblem_qk) or as a persistent model updated in place across the
+iterations of a fit (GurobiQkSession). Models are created in the process's
+shared environment (see src.solvers.environment).
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.solvers.common import qk_blocks, slack_weights
+from src.solvers.environment import get_environment
+
+try:
+    import gurobipy as gp
+    from gurobipy import GRB
+except ImportError:
+    gp = None
+    GRB = None
+
+
+# Lazy B constraints: initial working-set size, the B count above which the
+# mode is switched on automatically, and the margin of g(b) < 1 + margin that
+# also pulls near-active points into the model when violations are found
+LAZY_B_SIZE = 1000
+LAZY_B_MIN_POINTS = 5000
+LAZY_B_MARGIN = 0.05
+
+
+# Gurobi tolerances that tol= relaxes for inexact solves, with their defaults
+TOL_PARAMS = {"OptimalityTol": 1e-6, "FeasibilityTol": 1e-6, "BarConvTol": 1e-8}
+
+
+def _set_tolerances(model, tol):
+    """Relaxes the solver tolerances to tol; None restores the preset's values."""
+    environment = get_environment()
+    for name, default in TOL_PARAMS.items():
+        default = environment.default(name, default)
+        model.setParam(name, default if tol is None else min(max(tol, default), 1e-2))
+
+
+def _has_solution(model):
+    # A time-limited solve still yields a usable (suboptimal) cone if it has an
+    # incumbent; any w, xi >= 0, gamma >= 1 defines a valid cone
+    return model.status == GRB.OPTIMAL or (
+        model.status == GRB.TIME_LIMIT and model.SolCount > 0
+    )
+
+
+def _status_name(model):
+    """Status of a finished solve as counted in the solve statistics."""
+    if model.status == GRB.OPTIMAL:
+        return "optimal"
+    return "time_limit" if model.status == GRB.TIME_LIMIT else "failed"
+
+
+def _lazy_b_size(lazy_b, p_sub):
+    """Resolves the lazy_b option to an initial working-set size (0 = off)."""
+    if lazy_b is None:
+        lazy_b = LAZY_B_SIZE if p_sub > LAZY_B_MIN_POINTS else 0
+    return min(int(lazy_b), p_sub) if lazy_b else 0
+
+
+def build_qk_model(
+    A_indices, B_indices, A_full, B_full, center_a, C, lamb, weights=None
+):
+    """
+    Builds (without solving) the Q_k model using the Gurobi matrix API.
+
+    All variables live in a single MVar laid out as [w, xi, gamma, y, z] and every
+    constraint is added with one addMConstr call, so the build cost is dominated by
+    NumPy work instead of per-point Python overhead.
+
+    weights optionally overrides the (c_A, c_B) slack weights of the rows, which
+    default to 1/m and C/p (see slack_weights).
+
+    Returns:
+        Tuple (model, x) where x is the stacked MVar of all decision variables.
+    """
+    if gp is None:
+        raise ImportError("gurobipy not installed")
+
+    m_sub = len(A_indices)
+    p_sub = len(B_indices)
+    n_features = A_full.shape[1]
+    n_vars = n_features + 2 + m_sub + p_sub
+
+    D_A, n_A = qk_blocks(A_indices, A_full, center_a)
+    D_B, n_B = qk_blocks(B_indices, B_full, center_a)
+
+    model = get_environment().new_model("Q_k")
+
+    # Variables: w is free, xi >= 0, gamma >= 1, slacks y, z >= 0
+    lb = np.zeros(n_vars)
+    lb[:n_features] = -GRB.INFINITY
+    lb[n_features + 1] = 1.0
+    x = model.addMVar(n_vars, lb=lb, name="x")
+
+    # Constraint 1 (A): w'(a_i - a) + ||a_i - a||_1 xi - gamma - y_i <= -1
+    # Constraint 2 (B): -w'(b_j - a) - ||b_j - a||_1 xi + gamma - z_j <= -1
+    rows_A = sp.hstack(
+        [
+            sp.csr_matrix(D_A),
+            sp.csr_matrix(n_A[:, None]),
+            sp.csr_matrix(-np.ones((m_sub, 1))),
+            -sp.identity(m_sub, format="csr"),
+            sp.csr_matrix((m_sub, p_sub)),
+        ]
+    )
+    rows_B = sp.hstack(
+        [
+            sp.csr_matrix(-D_B),
+            sp.csr_matrix(-n_B[:, None]),
+            sp.csr_matrix(np.ones((p_sub, 1))),
+            sp.csr_matrix((p_sub, m_sub)),
+            -sp.identity(p_sub, format="csr"),
+        ]
+    )
+    A_mat = sp.vstack([rows_A, rows_B], format="csr")
+    model.addMConstr(A_mat, x, GRB.LESS_EQUAL, -np.ones(m_sub + p_sub))
+
+    # Objective: lambda*(||w||^2 + xi^2 + gamma^2) + 1/m * sum(y) + C/p * sum(z)
+    q_diag = np.zeros(n_vars)
+    q_diag[: n_features + 2] = lamb
+    c_A, c_B = weights or slack_weights(A_indices, B_indices, C)
+    c_vec = np.zeros(n_vars)
+    c_vec[n_features + 2 : n_features + 2 + m_sub] = c_A
+    c_vec[n_features + 2 + m_sub :] = c_B
+    model.setMObjective(sp.diags(q_diag, format="csr"), c_vec, 0.0, sense=GRB.MINIMIZE)
+
+    return model, x
+
+
+def _add_b_rows(model, head, D_B, n_B, weights):
+    """
+    Adds B rows -w'(b-a) - ||b-a||_1 xi + gamma - z <= -1 with new slacks z.
+
+    head is the MVar [w, xi, gamma]; returns (MConstr, z MVar).
+    """
+    k = len(n_B)
+    z = model.addMVar(k, lb=0.0, obj=weights)
+    M = np.hstack([-D_B, -n_B[:, None], np.ones((k, 1))])
+    constrs = model.addConstr(sp.csr_matrix(M) @ head - z <= -np.ones(k))
+    return constrs, z
+
+
+def _violated_b(pending, D_B, n_B, w, xi, gamma, limit):
+    """
+    Pending B points that need a row: none if every g(b) >= 1 (z_b = 0 is
+    optimal), otherwise the (at most limit) lowest-g points with
+    g(b) < 1 + LAZY_B_MARGIN. D_B and n_B are the qk_blocks of the pending points.
+    """
+    g_vals = D_B @ w + xi * n_B - gamma
+    if not np.any(g_vals < 1.0):
+        return pending[:0]
+    near = np.flatnonzero(g_vals < 1.0 + LAZY_B_MARGIN)
+    if len(near) > limit:
+        near = near[np.argpartition(g_vals[near], limit - 1)[:limit]]
+    return pending[near]
+
+
+def solve_subproblem_qk(
+    A_indices,
+    B_indices,
+    A_full,
+    B_full,
+    center_a,
+    C,
+    lamb,
+    lazy_b=None,
+    sample_weight=None,
+    tol=None,
+    time_limit=None,
+):
+    """
+    Solves the QP subproblem for a given center.
+
+    Args:
+        A_indices: Current active indices for Set A (Class -1)
+        B_indices: Current active indices for Set B (Class +1)
+        A_full: Full dataset A (Class -1)
+        B_full: Full dataset B (Class +1)
+        center_a: The chosen center point (from A)
+        C: Hyperparameter for misclassification penalty
+        lamb: Hyperparameter for regularization
+        lazy_b: Initial B working-set size for cutting-plane mode, 0 to add every
+            B row up front (default: on above LAZY_B_MIN_POINTS B points)
+        sample_weight: Optional per-point weights over the rows of the full data
+            that scale the slack weights (see slack_weights)
+        tol: Relaxed optimality / feasibility tolerance for a cheaper inexact
+            solve (None keeps Gurobi's defaults)
+        time_limit: Gurobi TimeLimit in seconds; the incumbent is returned when
+            it is hit
+
+    In cutting-plane mode only the lazy_b B points nearest to the center (in L1)
+    start in the model. After each solve, all remaining B points are checked in
+    one pass and up to lazy_b of the violated / near-active ones are added,
+    until none is violated.
+    Rows left out have z = 0 at the optimum, so the solution is that of the full
+    problem.
+
+    Returns:
+        Dictionary with optimal parameters w, xi, gamma, obj, or None if failed.
+    """
+    # If A is empty, we stop (Set A is fully covered).
+    if len(A_indices) == 0:
+        return None
+    if gp is None:
+        raise ImportError("gurobipy not installed")
+
+    n_features = A_full.shape[1]
+    B_indices = np.asarray(B_indices, dtype=np.intp)
+    p_sub = len(B_indices)
+    size = _lazy_b_size(lazy_b, p_sub)
+    c_A, c_B = slack_weights(A_indices, B_indices, C, sample_weight)
+
+    try:
+        if size:
+            D_B, n_B = qk_blocks(B_indices, B_full, center_a)
+            working = np.zeros(p_sub, dtype=bool)
+            working[np.argpartition(n_B, size - 1)[:size]] = True
+            model, x = build_qk_model(
+                A_indices,
+                B_indices[working],
+                A_full,
+                B_full,
+                center_a,
+                C,
+                lamb,
+                weights=(c_A, c_B[working]),
+            )
+            # Dual simplex re-solves warm after rows are added
+            model.setParam("Method", 1)
+        else:
+            model, x = build_qk_model(
+                A_indices,
+                B_indices,
+                A_full,
+                B_full,
+                center_a,
+                C,
+                lamb,
+                weights=(c_A, c_B),
+            )
+        head = x[: n_features + 2]
+        if tol is not None:
+            _set_tolerances(model, tol)
+        if time_limit is not None:
+            model.setParam("TimeLimit", time_limit)
+
+        runtime, iterations = 0.0, 0
+        while True:
+            model.optimize()
+            runtime += model.Runtime
+            iterations += int(model.IterCount + model.BarIterCount)
+            if not _has_solution(model):
+                break
+            sol = head.X
+            if not size or model.status == GRB.TIME_LIMIT:
+                break
+            pending = np.flatnonzero(~working)
+            added = _violated_b(
+                pending,
+                D_B[pending],
+                n_B[pending],
+                sol[:n_features],
+                sol[n_features],
+                sol[n_features + 1],
+                size,
+            )
+            if len(added) == 0:
+                break
+            _add_b_rows(model, head, D_B[added], n_B[added], c_B[added])
+            working[added] = True
+
+        get_environment().record(runtime, iterations, _status_name(model))
+        if not _has_solution(model):
+            return None
+        return {
+            "w": sol[:n_features].copy(),
+            "xi": float(sol[n_features]),
+            "gamma": float(sol[n_features + 1]),
+            "obj": model.ObjVal,
+        }
+
+    except gp.GurobiError as e:
+        print(f"Gurobi Error: {e}")
+        return None
+
+
+class GurobiQkSession:
+    """
+    Persistent Q_k model that stays alive for a whole RPCF fit.
+
+    The model is built once over the initial active sets using the formulation
+
+        w'x_i - t + ||x_i - a||_1 u - gamma - y_i <= -1      (x_i in A)
+        -w'x_j + t - ||x_j - a||_1 u + gamma - z_j <= -1     (x_j in B)
+        t - a'w = 0,  u - xi = 0
+
+    so moving to a new center a only touches the link row and the column of u,
+    a copy of xi that carries the center-dependent coefficients. The column is
+    replaced with one addVar call rather than one chgCoeff per row. Pruned points have their constraint and slack removed, and the 1/m, C/p
+    slack weights are refreshed as the active sets shrink. Gurobi keeps the
+    previous basis across these modifications, so each solve is warm-started
+    from the previous iteration's solution.
+
+    With lazy_b (on by default above LAZY_B_MIN_POINTS B points) the B rows
+    start out pending: each solve seeds the model with the pending B points
+    nearest to the center, then adds up to lazy_b violated / near-active ones
+    per round until every pending point has g(b) >= 1. Rows are kept once added.
+
+    sample_weight (one weight per row of X_full) scales the slack weights, see
+    slack_weights.
+    """
+
+    def __init__(
+        self,
+        X_full,
+        A_indices,
+        B_indices,
+        C,
+        lamb,
+        method=None,
+        lazy_b=None,
+        sample_weight=None,
+    ):
+        if gp is None:
+            raise ImportError("gurobipy not installed")
+
+        self.X_full = X_full
+        self.C = C
+        self.lamb = lamb
+        self.sample_weight = sample_weight
+        self.n_features = X_full.shape[1]
+        self.center = None
+        self.last_stats = None  # Runtime, iterations and status of the last solve
+        self.tol = None  # Tolerance the model is currently set to
+        self.time_limit = None  # TimeLimit the model is currently set to
+
+        A_indices = np.asarray(A_indices, dtype=np.intp)
+        B_indices = np.asarray(B_indices, dtype=np.intp)
+        self.lazy_b = _lazy_b_size(lazy_b, len(B_indices))
+        # B points without a row yet (only used in lazy mode)
+        self.pending_B = np.zeros(len(X_full), dtype=bool)
+        if self.lazy_b:
+            self.pending_B[B_indices] = True
+            B_indices = B_indices[:0]
+        self.pending_weight = self._weight(np.flatnonzero(self.pending_B))
+        m_sub = len(A_indices)
+        p_sub = len(B_indices)
+        d = self.n_features
+
+        environment = get_environment()
+        model = environment.new_model("Q_k_session")
+        # Simplex (dual unless the preset says otherwise) so the basis is reused
+        # between iterations
+        if method is None:
+            method = environment.default("Method", 1)
+        model.setParam("Method", method)
+        self.model = model
+
+        # Variables laid out as [w, t, xi, gamma, y, z]
+        n_vars = d + 3 + m_sub + p_sub
+        lb = np.zeros(n_vars)
+        lb[: d + 1] = -GRB.INFINITY
+        lb[d + 2] = 1.0
+        x = model.addMVar(n_vars, lb=lb, name="x")
+
+        # The u column is added when the first center is set
+        ones_A = np.ones((m_sub, 1))
+        ones_B = np.ones((p_sub, 1))
+        rows_A = sp.hstack(
+            [
+                sp.csr_matrix(X_full[A_indices]),
+                sp.csr_matrix(np.hstack([-ones_A, np.zeros((m_sub, 1)), -ones_A])),
+                -sp.identity(m_sub, format="csr"),
+                sp.csr_matrix((m_sub, p_sub)),
+            ]
+        )
+        rows_B = sp.hstack(
+            [
+                sp.csr_matrix(-X_full[B_indices]),
+                sp.csr_matrix(np.hstack([ones_B, np.zeros((p_sub, 1)), ones_B])),
+                sp.csr_matrix((p_sub, m_sub)),
+                -sp.identity(p_sub, format="csr"),
+            ]
+        )
+        A_mat = sp.vstack([rows_A, rows_B], format="csr")
+        constrs = model.addMConstr(
+            A_mat, x, GRB.LESS_EQUAL, -np.ones(m_sub + p_sub)
+        ).tolist()
+
+        all_vars = x.tolist()
+        self.w = all_vars[:d]
+        self.t, self.xi, self.gamma = all_vars[d : d + 3]
+        slacks = all_vars[d + 3 :]
+        self.link = model.addConstr(self.t == 0, name="link")
+        self.xi_link = model.addConstr(self.xi == 0, name="xi_link")
+        self.u = None
+        self.start = None  # Basis from set_start, applied by the next solve
+
+        # Point index -> (constraint, slack)
+        self.rows_A = dict(
+            zip(A_indices.tolist(), zip(constrs[:m_sub], slacks[:m_sub]))
+        )
+        self.rows_B = dict(
+            zip(B_indices.tolist(), zip(constrs[m_sub:], slacks[m_sub:]))
+        )
+
+        self._set_objective()
+
+    def _set_objective(self):
+        """
+        Sets the lambda regularizer as the quadratic objective; the slack
+        weights are set as Obj attributes.
+        """
+        reg_vars = self.w + [self.xi, self.gamma]
+        reg = gp.QuadExpr()
+        reg.addTerms([self.lamb] * len(reg_vars), reg_vars, reg_vars)
+        self.model.setObjective(reg, GRB.MINIMIZE)
+        self._refresh_weights()
+
+    def _weight(self, indices):
+        """Total sample weight of the given points (their count if unweighted)."""
+        if self.sample_weight is None:
+            return len(indices)
+        return float(self.sample_weight[indices].sum())
+
+    def _refresh_weights(self):
+        """Sets the 1/m and C/p slack weights for the current active sets."""
+        A_keys = np.fromiter(self.rows_A, dtype=np.intp, count=len(self.rows_A))
+        B_keys = np.fromiter(self.rows_B, dtype=np.intp, count=len(self.rows_B))
+        c_A, c_B = slack_weights(A_keys, B_keys, self.C, self.sample_weight)
+        if self.pending_weight:
+            # Pending B points still count towards the C/p normalization
+            c_B *= self._weight(B_keys) / (self._weight(B_keys) + self.pending_weight)
+        if len(c_A):
+            slacks = [var for _, var in self.rows_A.values()]
+            self.model.setAttr("Obj", slacks, c_A.tolist())
+        if len(c_B):
+            slacks = [var for _, var in self.rows_B.values()]
+            self.model.setAttr("Obj", slacks, c_B.tolist())
+
+    def _add_rows(self, indices, rows, sign):
+        """
+        Adds rows and slacks for points of A (sign 1) or B (sign -1) at the
+        current center; rows is the point table they go into.
+        """
+        k = len(indices)
+        ones = np.ones((k, 1))
+        blocks = [self.X_full[indices], -ones]
+        head = self.w + [self.t]
+        if self.u is not None:
+            _, l1_norm = qk_blocks(indices, self.X_full, self.center)
+            blocks.append(l1_norm[:, None])
+            head.append(self.u)
+        blocks.append(-ones)
+        head.append(self.gamma)
+        M = sign * np.hstack(blocks)
+        slacks = self.model.addMVar(k, lb=0.0)
+        constrs = self.model.addConstr(
+            sp.csr_matrix(M) @ gp.MVar.fromlist(head) - slacks <= -np.ones(k)
+        ).tolist()
+        rows.update(zip(indices.tolist(), zip(constrs, slacks.tolist())))
+
+    def _add_pending(self, indices):
+        """Moves pending B points into the model at the current center."""
+        self._add_rows(indices, self.rows_B, -1.0)
+        self.pending_B[indices] = False
+        self.pending_weight -= self._weight(indices)
+        self._refresh_weights()
+
+    def _pending_violations(self):
+        """Pending B points to add after a solve (empty when none is violated)."""
+        pending = np.flatnonzero(self.pending_B)
+        if len(pending) == 0:
+            return pending
+        w = np.array(self.model.getAttr("X", self.w))
+        D_B, n_B = qk_blocks(pending, self.X_full, self.center)
+        return _violated_b(pending, D_B, n_B, w, self.xi.X, self.gamma.X, self.lazy_b)
+
+    def _set_center(self, center_a):
+        """Updates the link row and replaces the u column for a new center."""
+        model = self.model
+        for j in range(self.n_features):
+            model.chgCoeff(self.link, self.w[j], -center_a[j])
+
+        rows = [*self.rows_A.values(), *self.rows_B.values()]
+        constrs = [self.link, self.xi_link] + [constr for constr, _ in rows]
+        variables = self.w + [self.t, self.xi, self.gamma] + [var for _, var in rows]
+        coeffs = [-1.0]
+        for table, sign in ((self.rows_A, 1.0), (self.rows_B, -1.0)):
+            if table:
+                _, l1_norm = qk_blocks(list(table.keys()), self.X_full, center_a)
+                coeffs.extend((sign * l1_norm).tolist())
+
+        # Gurobi drops the basis when a basic variable is removed, so it is read
+        # first and set again with the new u in the old one's place
+        basis = None
+        if self.u is not None:
+            if self.start is None:
+                try:
+                    basis = (
+                        model.getAttr("VBasis", variables + [self.u]),
+                        model.getAttr("CBasis", constrs),
+                    )
+                except (AttributeError, gp.GurobiError):
+                    # No basis, e.g. after a failed solve
+                    basis = None
+            model.remove(self.u)
+        self.u = model.addVar(lb=0.0, name="u", column=gp.Column(coeffs, constrs[1:]))
+        if basis is not None:
+            model.update()
+            model.setAttr("VBasis", variables + [self.u], basis[0])
+            model.setAttr("CBasis", constrs, basis[1])
+        self.center = np.array(center_a, dtype=float)
+
+    def remove_points(self, A_removed=(), B_removed=()):
+        """
+        Drops the constraints and slacks of pruned points from the model.
+        """
+        to_remove = []
+        for rows, removed in ((self.rows_A, A_removed), (self.rows_B, B_removed)):
+            for idx in removed:
+                row = rows.pop(int(idx), None)
+                if row is None:
+                    # Pending B point that never got a row
+                    self.pending_B[idx] = False
+                    self.pending_weight -= self._weight([idx])
+                    continue
+                to_remove.extend(row)
+        if to_remove:
+            self.model.remove(to_remove)
+        if len(A_removed) or len(B_removed):
+            self._refresh_weights()
+
+    def reset(self, A_indices, B_indices, C, lamb):
+        """
+        Starts over from the given active sets with new hyperparameters, e.g.
+        for the next point of a regularization path. Points pruned since are
+        added back and the objective is updated; the model and its basis are
+        kept.
+        """
+        A_indices = np.asarray(A_indices, dtype=np.intp)
+        B_indices = np.asarray(B_indices, dtype=np.intp)
+        in_A = np.zeros(len(self.X_full), dtype=bool)
+        in_B = np.zeros(len(self.X_full), dtype=bool)
+        in_A[A_indices] = True
+        in_B[B_indices] = True
+        self.remove_points(
+            [idx for idx in self.rows_A if not in_A[idx]],
+            [idx for idx in self.rows_B if not in_B[idx]],
+        )
+        self.pending_B &= in_B
+        missing_A = A_indices[[idx not in self.rows_A for idx in A_indices.tolist()]]
+        missing_B = B_indices[[idx not in self.rows_B for idx in B_indices.tolist()]]
+        if len(missing_A):
+            self._add_rows(missing_A, self.rows_A, 1.0)
+        if self.lazy_b:
+            self.pending_B[missing_B] = True
+        elif len(missing_B):
+            self._add_rows(missing_B, self.rows_B, -1.0)
+        self.pending_weight = self._weight(np.flatnonzero(self.pending_B))
+        self.C = C
+        self.lamb = lamb
+        self._set_objective()
+
+    def solve(self, center_a, tol=None, time_limit=None):
+        """
+        Solves Q_k for the given center over the current active sets.
+
+        Args:
+            center_a: The chosen center point
+            tol: Relaxed tolerance for an inexact solve (None: exact defaults)
+            time_limit: Gurobi TimeLimit in seconds; the incumbent is returned
+                when it is hit
+
+        Returns:
+            Dictionary with optimal parameters w, xi, gamma, obj, or None if failed.
+        """
+        if len(self.rows_A) == 0:
+            return None
+
+        try:
+            if tol != self.tol:
+                _set_tolerances(self.model, tol)
+                self.tol = tol
+            if time_limit != self.time_limit:
+                self.model.setParam(
+                    "TimeLimit", GRB.INFINITY if time_limit is None else time_limit
+                )
+                self.time_limit = time_limit
+            if self.center is None or not np.array_equal(self.center, center_a):
+                self._set_center(center_a)
+            if self.start is not None:
+                self._apply_start(self.start)
+                self.start = None
+            seed = self.lazy_b - len(self.rows_B)
+            if self.lazy_b and seed > 0 and self.pending_weight > 0:
+                pending = np.flatnonzero(self.pending_B)
+                if seed < len(pending):
+                    _, l1_norm = qk_blocks(pending, self.X_full, self.center)
+                    pending = pending[np.argpartition(l1_norm, seed - 1)[:seed]]
+                self._add_pending(pending)
+
+            runtime, iterations = 0.0, 0
+            while True:
+                self.model.optimize()
+                runtime += self.model.Runtime
+                iterations += int(self.model.IterCount + self.model.BarIterCount)
+                if self.model.status != GRB.OPTIMAL or not self.lazy_b:
+                    break
+                added = self._pending_violations()
+                if len(added) == 0:
+                    break
+                self._add_pending(added)
+            self.last_stats = {
+                "runtime": runtime,
+                "iterations": iterations,
+                "status": self.model.status,
+            }
+            get_environment().record(runtime, iterations, _status_name(self.model))
+
+            if _has_solution(self.model):
+                return {
+                    "w": np.array(self.model.getAttr("X", self.w)),
+                    "xi": self.xi.X,
+                    "gamma": self.gamma.X,
+                    "obj": self.model.ObjVal,
+                }
+            else:
+                return None
+
+        except gp.GurobiError as e:
+            print(f"Gurobi Error: {e}")
+            return None
+
+    def get_start(self):
+        """
+        Returns the simplex basis of the last solve, keyed by point index so it
+        can seed a model over slightly different active sets. None if the basis
+        is unavailable.
+        """
+        model = self.model
+        try:
+            head = self.w + [self.t, self.xi, self.gamma, self.u]
+            rows = {}
+            for name, table in (("A", self.rows_A), ("B", self.rows_B)):
+                constrs = [constr for constr, _ in table.values()]
+                slacks = [var for _, var in table.values()]
+                rows[name] = dict(
+                    zip(
+                        table.keys(),
+                        zip(
+                            model.getAttr("CBasis", constrs),
+                            model.getAttr("VBasis", slacks),
+                        ),
+                    )
+                )
+            return {
+                "head": model.getAttr("VBasis", head),
+                "link": [self.link.CBasis, self.xi_link.CBasis],
+                "rows": rows,
+            }
+        except gp.GurobiError:
+            return None
+
+    def set_start(self, start):
+        """
+        Warm-starts the next solve from a basis returned by get_start.
+
+        Points that were not active in the source model start with a basic
+        slack and a nonbasic constraint; Gurobi repairs the basis if needed.
+        """
+        self.start = start
+
+    def _apply_start(self, start):
+        """Sets the basis of a start once the model has its center."""
+        model = self.model
+        model.update()
+        constrs, cbasis = [self.link, self.xi_link], list(start["link"])
+        slacks, vbasis = [], []
+        for name, table in (("A", self.rows_A), ("B", self.rows_B)):
+            source = start["rows"][name]
+            for idx, (constr, var) in table.items():
+                c_stat, v_stat = source.get(idx, (-1, 0))
+                constrs.append(constr)
+                cbasis.append(c_stat)
+                slacks.append(var)
+                vbasis.append(v_stat)
+        head = self.w + [self.t, self.xi, self.gamma, self.u]
+        model.setAttr("VBasis", head, start["head"])
+        model.setAttr("VBasis", slacks, vbasis)
+        model.setAttr("CBasis", constrs, cbasis)
+
+    def dispose(self):
+        self.model.dispose()
@@ -0,0 +1,498 @@
+"""
+Gurobi-free backend for the Q_k subproblem (NumPy/SciPy).
+
+Q_k is a regularized hinge problem in u = (w, xi, gamma):
+
+    min  lambda * ||u||^2 + sum_i c_i * max(0, 1 + g_i'u)    s.t. xi >= 0, gamma >= 1
+
+where g_i = (x_i - a, ||x_i - a||_1, -1) for points of A (c_i = 1/m) and the
+negated row for points of B (c_i = C/p). Only u has a quadratic term, so a
+primal-dual interior point method reduces every Newton step to one
+(n_features + 2)-sized Cholesky solve; all per-row work is vectorized.
+
+For large inputs the solve runs on a working set: a smoothed version of the
+problem (solved with L-BFGS-B) ranks rows by their distance to the hinge kink,
+the rows clearly on the positive side enter as a fixed linear term, the clearly
+inactive ones are dropped, and the working set grows until every row outside it
+agrees with the solution. The result is the exact optimum of the full problem.
+"""
+
+import time
+
+import numpy as np
+from scipy.optimize import Bounds, minimize
+
+from src.solvers.common import qk_blocks, slack_weights
+from src.solvers.environment import get_environment
+
+# An IPM that stalls (or runs out of iterations) with its dual residual and
+# relative gap below this is accepted as optimal
+NEAR_OPTIMAL_GAP = 1e-6
+
+# Statuses whose iterate is returned as a cone; the others make the solve fail
+USABLE_STATUSES = ("optimal", "time_limit")
+
+# Distance of a warm start from the bounds and the hinge kinks; a start from
+# the solution of a different center costs more iterations than a cold one,
+# so warm starts are only used for re-solves around the same center
+WARM_MARGIN = 0.3
+
+
+def qk_rows(A_indices, B_indices, A_full, B_full, center_a):
+    """
+    Stacks the hinge rows g_i of Q_k for the active A and B points.
+
+    Returns:
+        Matrix G of shape (m + p, n_features + 2).
+    """
+    D_A, n_A = qk_blocks(A_indices, A_full, center_a)
+    D_B, n_B = qk_blocks(B_indices, B_full, center_a)
+    rows_A = np.hstack([D_A, n_A[:, None], -np.ones((len(n_A), 1))])
+    rows_B = np.hstack([-D_B, -n_B[:, None], np.ones((len(n_B), 1))])
+    return np.vstack([rows_A, rows_B])
+
+
+def _lower_bounds(n_cols):
+    """Lower bounds of u: w is free, xi >= 0, gamma >= 1."""
+    lower = np.full(n_cols, -np.inf)
+    lower[-2] = 0.0
+    lower[-1] = 1.0
+    return lower
+
+
+def _max_step(x, dx):
+    """Largest step t with x + t * dx >= 0."""
+    neg = dx < 0
+    return np.min(-x[neg] / dx[neg]) if neg.any() else np.inf
+
+
+def _newton_direction(G, L, bnd, it, r1, r2, r3):
+    """
+    Solves the reduced Newton system for the complementarity residuals r1
+    (alpha*p), r2 (beta*s) and r3 (nu*q) of the iterate it.
+
+    Returns:
+        Tuple (du, ds, dp, d_alpha, d_nu).
+    """
+    alpha, beta, p, s, q, nu = (it[k] for k in ("alpha", "beta", "p", "s", "q", "nu"))
+    g0 = (beta * r1 - alpha * r2) / (p * beta + alpha * s)
+    rhs = -it["r_d"] - G.T @ g0
+    rhs[bnd] += r3 / q
+    du = np.linalg.solve(L.T, np.linalg.solve(L, rhs))
+    Gdu = G @ du
+    d_alpha = it["weight"] * Gdu + g0
+    ds = (r2 + s * d_alpha) / beta
+    d_nu = (r3 - nu * du[bnd]) / q
+    return du, ds, ds - Gdu, d_alpha, d_nu
+
+
+def _step_lengths(it, bnd, du, ds, dp, d_alpha, d_nu):
+    """Largest primal and dual steps (at most 1) that keep the iterate interior."""
+    primal = min(
+        1.0,
+        _max_step(it["s"], ds),
+        _max_step(it["p"], dp),
+        _max_step(it["q"], du[bnd]),
+    )
+    dual = min(
+        1.0,
+        _max_step(it["alpha"], d_alpha),
+        _max_step(it["beta"], -d_alpha),
+        _max_step(it["nu"], d_nu),
+    )
+    return primal, dual
+
+
+def _warm_point(G, c, r, lamb, lower, bnd, u0, margin):
+    """
+    Interior starting point built from a previous solution u0 of a problem
+    with the same center: u0 moved margin inside its bounds and each row's
+    slacks margin off the hinge kink. Rows clearly on one side of the kink
+    get duals near 0 or c, the rows at the kink least-squares duals from
+    the stationarity condition of w.
+
+    Returns:
+        Tuple (u, s, alpha, nu).
+    """
+    u = np.array(u0, dtype=float)
+    u[bnd] = np.maximum(u[bnd], lower[bnd] + margin)
+    t = 1.0 + G @ u
+    s = np.maximum(t, 0.0) + margin
+    p = s - t
+    alpha = np.where(t > 0, 1.0 - margin, margin) * c
+    kink = np.abs(t) < margin
+    if kink.any():
+        free = np.ones(len(u), dtype=bool)
+        free[bnd] = False
+        rest = 2.0 * lamb * u + r + G[~kink].T @ alpha[~kink]
+        a_kink = np.linalg.lstsq(G[kink][:, free].T, -rest[free], rcond=None)[0]
+        alpha[kink] = np.clip(a_kink, margin * c[kink], (1.0 - margin) * c[kink])
+    # Bound duals absorb the stationarity residual of xi and gamma
+    r_d = 2.0 * lamb * u + r + G.T @ alpha
+    mu = (alpha @ p + (c - alpha) @ s) / (2 * len(c))
+    nu = np.maximum(r_d[bnd], mu / (u[bnd] - lower[bnd]))
+    return u, s, alpha, nu
+
+
+def _interior_point(
+    G, c, r, lamb, lower, u0=None, tol=1e-11, max_iter=100, deadline=None
+):
+    """
+    Mehrotra predictor-corrector IPM for
+
+        min lambda*||u||^2 + r'u + c's   s.t.  s >= 1 + G u,  s >= 0,  u >= lower
+
+    The row slack p = s - G u - 1 is kept implicit and the row duals alpha
+    live in (0, c), so each iteration costs two passes over G plus a small
+    Cholesky factorization. With u0 the method starts from _warm_point
+    instead of the fixed cold point.
+
+    Returns:
+        Tuple (u, n_iter, status) with status "optimal", "time_limit",
+        "iteration_limit" or "numerical" (the iterate stalled before
+        converging). A stall within NEAR_OPTIMAL_GAP still counts as optimal.
+    """
+    n_rows, n_cols = G.shape
+    bnd = np.flatnonzero(np.isfinite(lower))
+    lb = lower[bnd]
+    m_tot = 2 * n_rows + len(bnd)
+
+    if u0 is None:
+        u = np.zeros(n_cols)
+        u[bnd] = lb + 1.0
+        s = np.maximum(1.0 + G @ u, 0.0) + 1.0
+        alpha = c / 2.0
+        nu = np.full(len(bnd), max(alpha @ (2.0 * s - 1.0 - G @ u) / m_tot, 1e-12))
+    else:
+        u, s, alpha, nu = _warm_point(G, c, r, lamb, lower, bnd, u0, WARM_MARGIN)
+
+    status = "iteration_limit"
+    for n_iter in range(1, max_iter + 1):
+        p = s - G @ u - 1.0
+        beta = c - alpha
+        q = u[bnd] - lb
+        r_d = 2.0 * lamb * u + r + G.T @ alpha
+        r_d[bnd] -= nu
+        mu = (alpha @ p + beta @ s + nu @ q) / m_tot
+        obj = lamb * (u @ u) + r @ u + c @ s
+        residual = np.abs(r_d).max()
+        gap = m_tot * mu / max(1.0, abs(obj))
+        if residual < 1e-9 and gap < tol:
+            status = "optimal"
+            break
+        if np.any(q <= 0) or np.any(beta <= 0):
+            # A bound or a row dual reached its limit up to round-off
+            status = "numerical"
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            # Out of time; u is within its bounds, so it still defines a cone
+            status = "time_limit"
+            break
+
+        # Normal equations in u only
+        weight = alpha * beta / (p * beta + alpha * s)
+        H = 2.0 * lamb * np.eye(n_cols) + G.T @ (G * weight[:, None])
+        H[bnd, bnd] += nu / q
+        try:
+            L = np.linalg.cholesky(H)
+        except np.linalg.LinAlgError:
+            status = "numerical"
+            break
+        it = {
+            "alpha": alpha,
+            "beta": beta,
+            "p": p,
+            "s": s,
+            "q": q,
+            "nu": nu,
+            "r_d": r_d,
+            "weight": weight,
+        }
+
+        # Predictor (affine scaling) step
+        du, ds, dp, d_alpha, d_nu = _newton_direction(
+            G, L, bnd, it, -alpha * p, -beta * s, -nu * q
+        )
+        t_p, t_d = _step_lengths(it, bnd, du, ds, dp, d_alpha, d_nu)
+        mu_aff = (
+            (alpha + t_d * d_alpha) @ (p + t_p * dp)
+            + (beta - t_d * d_alpha) @ (s + t_p * ds)
+            + (nu + t_d * d_nu) @ (q + t_p * du[bnd])
+        ) / m_tot
+        sigma_mu = (mu_aff / mu) ** 3 * mu
+
+        # Centering-corrector step
+        du, ds, dp, d_alpha, d_nu = _newton_direction(
+            G,
+            L,
+            bnd,
+            it,
+            sigma_mu - alpha * p - d_alpha * dp,
+            sigma_mu - beta * s + d_alpha * ds,
+            sigma_mu - nu * q - d_nu * du[bnd],
+        )
+        t_p, t_d = _step_lengths(it, bnd, du, ds, dp, d_alpha, d_nu)
+        t_p = min(1.0, 0.995 * t_p)
+        t_d = min(1.0, 0.995 * t_d)
+        u = u + t_p * du
+        s = s + t_p * ds
+        alpha = alpha + t_d * d_alpha
+        nu = nu + t_d * d_nu
+
+    if status in ("numerical", "iteration_limit") and (
+        residual < NEAR_OPTIMAL_GAP and gap < NEAR_OPTIMAL_GAP
+    ):
+        status = "optimal"
+    return u, n_iter, status
+
+
+def _smoothed_start(G, c, lamb, lower, u0, mus=(1e-1, 1e-2, 1e-3)):
+    """
+    Approximately solves Q_k with the hinge replaced by a Huber-smoothed
+    version, used to rank rows when building the working set.
+    """
+    bounds = Bounds(lower, np.full(len(lower), np.inf))
+    u = u0
+    for mu in mus:
+
+        def objective(u, mu=mu):
+            t = 1.0 + G @ u
+            h = np.where(t <= 0, 0.0, np.where(t < mu, t * t / (2 * mu), t - mu / 2))
+            grad = 2.0 * lamb * u + G.T @ (c * np.clip(t / mu, 0.0, 1.0))
+            return lamb * (u @ u) + c @ h, grad
+
+        u = minimize(
+            objective,
+            u,
+            jac=True,
+            method="L-BFGS-B",
+            bounds=bounds,
+            options={"maxiter": 200},
+        ).x
+    return u
+
+
+def solve_qk_native(
+    G, c, lamb, u0=None, work_size=2000, tol=1e-9, gap_tol=1e-11, deadline=None
+):
+    """
+    Solves Q_k given its hinge rows.
+
+    Args:
+        G: Hinge rows, shape (n_rows, n_features + 2)
+        c: Per-row slack weights (1/m for A rows, C/p for B rows)
+        lamb: Regularization parameter
+        u0: Optional warm start for (w, xi, gamma), a solution for the same
+            center (e.g. of a neighbouring C and lambda)
+        work_size: Initial working-set size; smaller inputs are solved directly
+        tol: Tolerance on g_i'u when checking rows outside the working set
+        gap_tol: Relative duality gap at which the interior point method stops
+        deadline: Optional time.perf_counter() value after which the current
+            iterate is returned
+
+    Returns:
+        Tuple (u, obj, n_iter, status) with the solution (w, xi, gamma), the
+        objective, the total number of interior point iterations and the status
+        of the last interior point solve (see _interior_point).
+    """
+    n_rows, n_cols = G.shape
+    lower = _lower_bounds(n_cols)
+
+    if n_rows > work_size:
+        u = np.maximum(lower, np.zeros(n_cols) if u0 is None else u0)
+        t = 1.0 + G @ _smoothed_start(G, c, lamb, lower, u)
+        working = np.zeros(n_rows, dtype=bool)
+        working[np.argpartition(np.abs(t), work_size)[:work_size]] = True
+        positive = ~working & (t > 0)
+    else:
+        working = np.ones(n_rows, dtype=bool)
+        positive = np.zeros(n_rows, dtype=bool)
+
+    total_iter = 0
+    while True:
+        r = G[positive].T @ c[positive]
+        # After the working set grows, restart from the previous solution
+        u, n_iter, status = _interior_point(
+            G[working],
+            c[working],
+            r,
+            lamb,
+            lower,
+            u0=u0,
+            tol=gap_tol,
+            deadline=deadline,
+        )
+        u0 = u
+        total_iter += n_iter
+        t = 1.0 + G @ u
+        if status != "optimal":
+            break
+
+        # Rows outside the working set must agree with their assumed side
+        wrong = ~working & np.where(positive, t < -tol, t > tol)
+        if not wrong.any():
+            break
+        working |= wrong
+        positive &= ~wrong
+
+    obj = lamb * (u @ u) + c @ np.maximum(0.0, t)
+    return u, obj, total_iter, status
+
+
+def _slack_weights(A_indices, B_indices, C, sample_weight=None):
+    """Per-row weights, A rows first (see slack_weights)."""
+    return np.concatenate(slack_weights(A_indices, B_indices, C, sample_weight))
+
+
+def _to_params(u, obj):
+    return {
+        "w": u[:-2].copy(),
+        "xi": float(u[-2]),
+        "gamma": float(u[-1]),
+        "obj": float(obj),
+    }
+
+
+def _gap_tol(tol):
+    # An inexact solve stops at the relative gap tol instead of the default
+    return 1e-11 if tol is None else max(tol, 1e-11)
+
+
+def _deadline(time_limit):
+    return None if time_limit is None else time.perf_counter() + time_limit
+
+
+def _status_name(status):
+    """Status of a finished solve as counted in the solve statistics."""
+    return status if status in USABLE_STATUSES else "failed"
+
+
+def solve_subproblem_qk(
+    A_indices,
+    B_indices,
+    A_full,
+    B_full,
+    center_a,
+    C,
+    lamb,
+    sample_weight=None,
+    tol=None,
+    time_limit=None,
+):
+    """
+    Solves the QP subproblem for a given center without Gurobi.
+
+    Same arguments and return value as the Gurobi backend. On time_limit the
+    last interior point iterate is returned; an interior point method that
+    stalls or hits its iteration limit returns None.
+    """
+    if len(A_indices) == 0:
+        return None
+
+    G = qk_rows(A_indices, B_indices, A_full, B_full, center_a)
+    c = _slack_weights(A_indices, B_indices, C, sample_weight)
+    start = time.perf_counter()
+    u, obj, n_iter, status = solve_qk_native(
+        G, c, lamb, gap_tol=_gap_tol(tol), deadline=_deadline(time_limit)
+    )
+    get_environment().record(time.perf_counter() - start, n_iter, _status_name(status))
+    if status not in USABLE_STATUSES:
+        return None
+    return _to_params(u, obj)
+
+
+class NativeQkSession:
+    """
+    Per-fit state of the native backend.
+
+    Keeps boolean active masks over the full data, so pruning is an
+    O(removed) update. Solves start cold unless set_start supplied a solution
+    for the same center (path mode).
+    """
+
+    def __init__(self, X_full, A_indices, B_indices, C, lamb, sample_weight=None):
+        self.X_full = X_full
+        self.C = C
+        self.lamb = lamb
+        self.sample_weight = sample_weight
+        self.active_A = np.zeros(len(X_full), dtype=bool)
+        self.active_B = np.zeros(len(X_full), dtype=bool)
+        self.active_A[np.asarray(A_indices, dtype=np.intp)] = True
+        self.active_B[np.asarray(B_indices, dtype=np.intp)] = True
+        self.u = None
+        self.start = None  # Warm start of the next solve only
+        self.last_stats = None  # Runtime, iterations and status of the last solve
+
+    def remove_points(self, A_removed=(), B_removed=()):
+        """
+        Drops pruned points from the active sets.
+        """
+        self.active_A[np.asarray(A_removed, dtype=np.intp)] = False
+        self.active_B[np.asarray(B_removed, dtype=np.intp)] = False
+
+    def reset(self, A_indices, B_indices, C, lamb):
+        """
+        Starts over from the given active sets with new hyperparameters, e.g.
+        for the next point of a regularization path.
+        """
+        self.active_A[:] = False
+        self.active_B[:] = False
+        self.active_A[np.asarray(A_indices, dtype=np.intp)] = True
+        self.active_B[np.asarray(B_indices, dtype=np.intp)] = True
+        self.C = C
+        self.lamb = lamb
+
+    def solve(self, center_a, tol=None, time_limit=None):
+        """
+        Solves Q_k for the given center over the current active sets; tol
+        relaxes the stopping gap for an inexact solve and time_limit (seconds)
+        returns the current iterate when it runs out.
+
+        Returns:
+            Dictionary with optimal parameters w, xi, gamma, obj, or None if failed.
+        """
+        A_indices = np.flatnonzero(self.active_A)
+        B_indices = np.flatnonzero(self.active_B)
+        if len(A_indices) == 0:
+            return None
+
+        G = qk_rows(A_indices, B_indices, self.X_full, self.X_full, center_a)
+        u0, self.start = self.start, None
+        start = time.perf_counter()
+        u, obj, n_iter, status = solve_qk_native(
+            G,
+            _slack_weights(A_indices, B_indices, self.C, self.sample_weight),
+            self.lamb,
+            u0=u0,
+            gap_tol=_gap_tol(tol),
+            deadline=_deadline(time_limit),
+        )
+        self.last_stats = {
+            "runtime": time.perf_counter() - start,
+            "iterations": n_iter,
+            "status": status,
+        }
+        get_environment().record(
+            self.last_stats["runtime"], n_iter, _status_name(status)
+        )
+        if status not in USABLE_STATUSES:
+            return None
+        self.u = u
+        return _to_params(u, obj)
+
+    def get_start(self):
+        """
+        Returns the last solution (w, xi, gamma), used as a warm start.
+        """
+        return None if self.u is None else self.u.copy()
+
+    def set_start(self, start):
+        """
+        Warm-starts the next solve from a vector returned by get_start for
+        the same center.
+        """
+        if start is not None:
+            self.start = np.array(start, dtype=float)
+
+    def dispose(self):
+        pass
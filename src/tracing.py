@@ -0,0 +1,177 @@
+"""
+Tracing Module.
+
+Instrumentation surface for RPCF.fit. A tracer records timed spans (session
+build, center selection, Q_k solves, pruning, VNS neighbor evaluation) and
+point events (one per learned cone) with their attributes, e.g. the solver
+runtime, iteration count and status, cache hits and removed points.
+
+    model.tracer = make_tracer("fit_trace.json")   # Chrome trace (chrome://tracing)
+    model.tracer = make_tracer("fit_trace.jsonl")  # One JSON object per line
+    model.fit(X, y)
+
+fit and partial_fit run inside the tracer's context, so the trace is written
+and its file closed when they end, also on an error. A later fit of the same
+model adds its records to the trace.
+
+The default NullTracer does nothing and allocates nothing per call.
+"""
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+
+_NULL_SPAN = nullcontext()
+
+# Buffered JSONL records written per file open
+FLUSH_RECORDS = 1000
+
+
+class NullTracer:
+    """
+    Default tracer; every hook is a no-op.
+    """
+
+    enabled = False
+
+    def span(self, name, **attrs):
+        return _NULL_SPAN
+
+    def event(self, name, **attrs):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+NULL_TRACER = NullTracer()
+
+
+class _RecordingTracer(ABC):
+    """
+    Shared span/event bookkeeping; subclasses decide how records are written.
+    """
+
+    enabled = True
+
+    def __init__(self, path):
+        self.path = path
+        self._start = time.perf_counter()
+        self._pid = os.getpid()
+
+    def _now_us(self):
+        return (time.perf_counter() - self._start) * 1e6
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """
+        Times the enclosed block. The yielded dict can be filled with results
+        that are only known at the end (e.g. solver statistics).
+        """
+        start = self._now_us()
+        try:
+            yield attrs
+        finally:
+            self._record(name, start, self._now_us() - start, attrs)
+
+    def event(self, name, **attrs):
+        self._record(name, self._now_us(), None, attrs)
+
+    @abstractmethod
+    def _record(self, name, ts, dur, attrs):
+        """Writes one span (dur in microseconds) or event (dur None)."""
+
+    @abstractmethod
+    def close(self):
+        """Flushes the records; the tracer stays usable afterwards."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonlTracer(_RecordingTracer):
+    """
+    Writes one JSON object per span/event: name, ts and dur (microseconds) and
+    the attributes. Records are buffered and appended every FLUSH_RECORDS
+    records and on close.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._lines = []
+        self._mode = "w"  # Later flushes append
+
+    def _record(self, name, ts, dur, attrs):
+        record = {"name": name, "ts": round(ts, 3)}
+        if dur is not None:
+            record["dur"] = round(dur, 3)
+        record.update(attrs)
+        self._lines.append(json.dumps(record, default=_to_json) + "\n")
+        if len(self._lines) >= FLUSH_RECORDS:
+            self.close()
+
+    def close(self):
+        with open(self.path, self._mode) as f:
+            f.writelines(self._lines)
+        self._lines = []
+        self._mode = "a"
+
+
+class ChromeTracer(_RecordingTracer):
+    """
+    Collects Chrome trace events (complete "X" spans and instant "i" events)
+    and writes them as {"traceEvents": [...]} on close.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.events = []
+
+    def _record(self, name, ts, dur, attrs):
+        event = {
+            "name": name,
+            "ts": ts,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+            "args": attrs,
+        }
+        if dur is None:
+            event.update(ph="i", s="t")
+        else:
+            event.update(ph="X", dur=dur)
+        self.events.append(event)
+
+    def close(self):
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": self.events}, f, default=_to_json)
+
+
+def _to_json(value):
+    # NumPy scalars and arrays in attributes
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def make_tracer(target=None):
+    """
+    Builds a tracer from a path: .jsonl -> JsonlTracer, anything else ->
+    ChromeTracer. None gives the no-op NULL_TRACER.
+    """
+    if target is None:
+        return NULL_TRACER
+    if str(target).endswith(".jsonl"):
+        return JsonlTracer(target)
+    return ChromeTracer(target)
@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 from sklearn.metrics import accuracy_score, classification_report
+
 from src.visualizer import plot_decision_boundary
 
 
@@ -13,7 +14,8 @@ def plot_and_save(model, X, y, title, filename):
             plt.savefig(filename)
             plt.close()
             print(f"Plot saved to {filename}")
-    except Exception as e:
+    except (OSError, ValueError, RuntimeError) as e:
+        # An unwritable path or a plotting failure only skips the figure
         print(f"Failed to plot {filename}: {e}")
 
 
@@ -1,7 +1,18 @@
-from src.rpcf import RPCF
-from src.solvers import solve_subproblem_qk
-from sklearn.neighbors import NearestNeighbors
+import hashlib
+import warnings
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from itertools import chain
+
 import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+from src.parallel import CandidatePool
+from src.rpcf import RPCF
+
+# Smallest training set for which n_jobs != 1 starts a process pool; below it
+# spawning the workers costs more than the parallel solves save
+POOL_MIN_POINTS = 2000
 
 
 class VNS_RPCF(RPCF):
@@ -12,95 +23,408 @@ class VNS_RPCF(RPCF):
     selection strategy with a meta-heuristic search (VNS). It attempts to find
     an optimal center 'a' that maximizes the separation efficiency (volume of A removed)
     in each iteration.
+
+    With n_jobs != 1 the candidate centers of a neighborhood are solved at the
+    same time in a persistent process pool, started for training sets of at
+    least POOL_MIN_POINTS points (smaller fits run sequentially and warn). In
+    deterministic mode (default) the results are then scanned in neighbor
+    order, which reproduces the sequential first-improvement choice exactly;
+    otherwise the first improving result to finish is accepted.
+
+    QP results are memoized per (center, active sets) in a bounded LRU cache of
+    cache_size entries, so revisited neighbors and the finally chosen center are
+    not solved twice. cache_hits / cache_misses count lookups of the last fit.
+
+    Neighborhoods are answered by one NearestNeighbors index built over class A
+    at the start of fit and filtered by the active mask.
+
+    With screen_top, center selection uses three fidelities: the VNS search
+    scores whole neighborhoods (k_neighbors candidates) with a batched L1
+    surrogate (active A points closer than the nearest active B point, see
+    ActiveSet.l1_ball_counts) instead of QPs, the screen_top best candidates
+    seen get an inexact Q_k solve at tolerance screen_tol, and only the chosen
+    center is solved exactly, warm-started from its inexact solve. With
+    screen_top=1 the best surrogate candidate goes straight to the exact solve.
+    Exact solves then drop to one per cone attempt. qp_solves counts the exact
+    and inexact solves of the last fit.
     """
 
     def __init__(
-        self, C=1.0, lamb=0.01, k_neighbors=10, max_vns_iter=5, max_neighbors_check=5
+        self,
+        C=1.0,
+        lamb=0.01,
+        k_neighbors=10,
+        max_vns_iter=5,
+        max_neighbors_check=5,
+        solver="gurobi",
+        n_jobs=1,
+        deterministic=True,
+        cache_size=256,
+        nn_rebuild_fraction=0.5,
+        coreset_size=None,
+        coreset_method="kmeans",
+        screen_top=None,
+        screen_tol=1e-3,
+        max_functions=None,
+        time_budget=None,
+        min_removed=1,
+        solver_time_limit=None,
     ):
-        super().__init__(C, lamb)
+        super().__init__(
+            C,
+            lamb,
+            solver=solver,
+            coreset_size=coreset_size,
+            coreset_method=coreset_method,
+            max_functions=max_functions,
+            time_budget=time_budget,
+            min_removed=min_removed,
+            solver_time_limit=solver_time_limit,
+        )
         self.k_neighbors = k_neighbors
         self.max_vns_iter = max_vns_iter
         self.max_neighbors_check = max_neighbors_check
+        self.n_jobs = n_jobs
+        self.deterministic = deterministic
+        self.pool = None
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # (center_idx, active_key) -> (params, score)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._active_key = None
+        self.nn_rebuild_fraction = nn_rebuild_fraction
+        self._nn_model = None
+        self._nn_points = None
+        self.screen_top = screen_top
+        self.screen_tol = screen_tol
+        self.qp_solves = {"exact": 0, "inexact": 0}
+        self._screened_start = None  # (center, start) of the last screening
+
+    def _set_active_key(self, A_indices, B_indices):
+        # Fingerprint of the active sets; Q_k only depends on them and the center
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.asarray(A_indices, dtype=np.int64).tobytes())
+        digest.update(b"|")
+        digest.update(np.asarray(B_indices, dtype=np.int64).tobytes())
+        self._active_key = digest.digest()
+
+    def _cache_get(self, center_idx):
+        key = (int(center_idx), self._active_key)
+        entry = self.cache.get(key)
+        if entry is None:
+            self.cache_misses += 1
+            return None
+        self.cache.move_to_end(key)
+        self.cache_hits += 1
+        return entry
+
+    def _cache_put(self, center_idx, params, score):
+        if self.cache_size <= 0:
+            return
+        key = (int(center_idx), self._active_key)
+        self.cache[key] = (params, score)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _solve_center(self, center_idx):
+        # Reuse the QP of the selected center when selection already solved it
+        self._set_active_key(self.current_A_indices, self.current_B_indices)
+        entry = self._cache_get(center_idx)
+        if entry is not None and entry[0] is not None:
+            self.tracer.event("solve_cached", center=int(center_idx))
+            return entry[0]
+        self.qp_solves["exact"] += 1
+        start, self._screened_start = self._screened_start, None
+        if start is not None and start[0] == center_idx:
+            self.session.set_start(start[1])
+        return super()._solve_center(center_idx)
+
+    def _grow(self, X, sample_weight=None, checkpoint_path=None, resume_from=None):
+        self.cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.qp_solves = {"exact": 0, "inexact": 0}
+
+        # One neighbor index over all of class A, rebuilt only when the active
+        # set has shrunk below nn_rebuild_fraction of the indexed points
+        self.A_full = X
+        self._build_neighbor_index(self.active.A_indices)
+
+        # The pool lives for the whole fit so workers are spawned only once
+        if self.n_jobs != 1 and len(X) >= POOL_MIN_POINTS:
+            self.pool = CandidatePool(
+                X,
+                self.C,
+                self.lamb,
+                solver=self.solver,
+                n_jobs=self.n_jobs,
+                sample_weight=sample_weight,
+            )
+        elif self.n_jobs != 1:
+            # Shown once per process by the default warning filter
+            warnings.warn(
+                f"n_jobs is ignored for fits on fewer than {POOL_MIN_POINTS} "
+                "points, which run sequentially",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+        try:
+            super()._grow(X, sample_weight, checkpoint_path, resume_from)
+        finally:
+            self._nn_model = None
+            self._nn_points = None
+            if self.pool is not None:
+                self._drain_pool()
+                self.pool.close()
+                self.pool = None
+
+    def _drain_pool(self):
+        # Pool solves are counted once they have run; cancelled ones never do
+        for fidelity, count in self.pool.drain().items():
+            self.qp_solves[fidelity] += count
+
+    def _checkpoint_state(self):
+        # The QP cache is saved too, so a resumed fit does not re-solve it
+        if self.pool is not None:
+            self._drain_pool()
+        header, blocks = super()._checkpoint_state()
+        entries = list(self.cache.items())
+        header["cache"] = [
+            [center, key.hex(), params is not None, score]
+            for (center, key), (params, score) in entries
+        ]
+        header["cache_hits"] = self.cache_hits
+        header["cache_misses"] = self.cache_misses
+        header["qp_solves"] = self.qp_solves
+        solved = [params for _, (params, _) in entries if params is not None]
+        d = self.A_full.shape[1]
+        blocks["cache_w"] = np.array([p["w"] for p in solved], float).reshape(-1, d)
+        for name in ("xi", "gamma", "obj"):
+            blocks[f"cache_{name}"] = np.array([p[name] for p in solved], float)
+        return header, blocks
+
+    def _restore_state(self, header, arrays):
+        super()._restore_state(header, arrays)
+        self.cache.clear()
+        row = 0
+        for center, key, has_params, score in header["cache"]:
+            params = None
+            if has_params:
+                params = {
+                    "w": arrays["cache_w"][row].copy(),
+                    "xi": float(arrays["cache_xi"][row]),
+                    "gamma": float(arrays["cache_gamma"][row]),
+                    "obj": float(arrays["cache_obj"][row]),
+                }
+                row += 1
+            self.cache[(center, bytes.fromhex(key))] = (params, score)
+        self.cache_hits = header["cache_hits"]
+        self.cache_misses = header["cache_misses"]
+        self.qp_solves = header["qp_solves"]
+
+    def _evaluate_candidates(self, neighbor_indices, tol=None):
+        """
+        Yields (n_full_idx, params, removed_count) for the neighbors to check.
+
+        Sequentially this solves lazily, so the caller's first-improvement break
+        also stops the solving. With a pool, all neighbors are submitted at once
+        and yielded in neighbor order (deterministic) or completion order.
+        Inexact results (tol set) are neither read from nor stored in the cache.
+        """
+        fidelity = "exact" if tol is None else "inexact"
+        if self.pool is None:
+            for n_full_idx in neighbor_indices:
+                entry = self._cache_get(n_full_idx) if tol is None else None
+                if entry is not None:
+                    self.tracer.event("vns_cached", center=int(n_full_idx))
+                    yield (n_full_idx, *entry)
+                    continue
+
+                center_candidate = self.A_full[n_full_idx]
+
+                with self.tracer.span(
+                    "vns_evaluate", center=int(n_full_idx), tol=tol
+                ) as info:
+                    # Solve QP on the fit's persistent Q_k model (same active sets)
+                    params = self.session.solve(
+                        center_candidate,
+                        tol=tol,
+                        time_limit=self._solve_time_limit(),
+                    )
+                    self.qp_solves[fidelity] += 1
+                    score = 0
+                    if params is not None:
+                        # Efficiency (Cut Volume): active A points with g(a) <= 0
+                        score = self.active.count_covered(
+                            params["w"], params["xi"], params["gamma"], center_candidate
+                        )
+                    if self.tracer.enabled:
+                        info.update(self.session.last_stats or {}, score=score)
+
+                if tol is None:
+                    self._cache_put(n_full_idx, params, score)
+                yield n_full_idx, params, score
+            return
+
+        # Cached neighbors are answered directly; only misses go to the pool
+        pending = []
+        for n_full_idx in neighbor_indices:
+            entry = self._cache_get(n_full_idx) if tol is None else None
+            if entry is not None:
+                pending.append((n_full_idx, *entry))
+            else:
+                pending.append(
+                    self.pool.submit(
+                        n_full_idx, tol, self._solve_time_limit(), tag=fidelity
+                    )
+                )
+        futures = [item for item in pending if not isinstance(item, tuple)]
+        try:
+            if self.deterministic:
+                results = (
+                    item if isinstance(item, tuple) else item.result()
+                    for item in pending
+                )
+            else:
+                cached = [item for item in pending if isinstance(item, tuple)]
+                results = chain(
+                    cached, (future.result() for future in as_completed(futures))
+                )
+            for n_full_idx, params, score in results:
+                if tol is None:
+                    self._cache_put(n_full_idx, params, score)
+                if self.tracer.enabled:
+                    self.tracer.event(
+                        "vns_candidate", center=int(n_full_idx), score=score
+                    )
+                yield n_full_idx, params, score
+        finally:
+            # Drop the candidates that are no longer needed
+            for future in futures:
+                future.cancel()
+
+    def _surrogate_candidates(self, neighbor_indices, screened):
+        """
+        Same protocol as _evaluate_candidates, but scores the neighbors with the
+        batched L1 surrogate instead of a QP; params is None (not solved).
+        Every score is also recorded in screened.
+        """
+        if not neighbor_indices:
+            return
+        scores = self.active.l1_ball_counts(neighbor_indices)
+        for n_full_idx, score in zip(neighbor_indices, scores.tolist()):
+            screened[n_full_idx] = score
+            yield n_full_idx, None, score
+
+    def _pick_screened(self, screened):
+        """
+        Solves the screen_top best surrogate candidates inexactly and returns
+        the one that removes the most A points (the best surrogate candidate if
+        all solves fail). A single candidate is returned without a solve.
+
+        Sequentially, the session's start after the winner's inexact solve is
+        kept in _screened_start, so its exact solve is warm-started.
+        """
+        top = sorted(screened, key=screened.get, reverse=True)[: self.screen_top]
+        if len(top) == 1:
+            return top[0]
+        best_idx, best_score = top[0], -np.inf
+        for n_full_idx, params, score in self._evaluate_candidates(
+            top, tol=self.screen_tol
+        ):
+            if params is not None and score > best_score:
+                best_idx, best_score = n_full_idx, score
+                if self.pool is None:
+                    self._screened_start = (n_full_idx, self.session.get_start())
+        return best_idx
+
+    def _build_neighbor_index(self, indices):
+        """
+        Fits the neighbor index over the given A points (indices in A_full).
+        """
+        self._nn_points = indices
+        self._nn_model = NearestNeighbors().fit(self.A_full[indices])
+
+    def _active_neighbors(self, query_idx, k, active):
+        """
+        Returns the k nearest active points to A_full[query_idx], nearest first.
+
+        The index may still contain pruned points, so the query is widened until
+        enough active neighbors are found.
+        """
+        n_points = len(self._nn_points)
+        n_query = min(n_points, 2 * k)
+        while True:
+            _, indices = self._nn_model.kneighbors(
+                self.A_full[[query_idx]], n_neighbors=n_query
+            )
+            neighbors = self._nn_points[indices[0]]
+            neighbors = neighbors[active[neighbors]]
+            if len(neighbors) >= k or n_query == n_points:
+                return neighbors[:k].tolist()
+            n_query = min(n_points, 2 * n_query)
 
     def select_center(self, candidates_indices):
         """
         Selects the best center using Variable Neighborhood Search (VNS).
         """
-        # candidates_indices is a list of valid indices in self.A_full
+        # candidates_indices are the active indices in self.A_full (self.active)
 
         # 1. Start with a random candidate
-        current_best_idx = np.random.choice(candidates_indices)
+        current_best_idx = self.rng.choice(candidates_indices)
         current_best_score = -np.inf
 
-        # Build NN for local search space on the CURRENT candidates
-        candidate_data = self.A_full[candidates_indices]
-
         # Safety check depending on number of candidates
         curr_k = min(self.k_neighbors, len(candidates_indices))
         if curr_k < 1:
             return current_best_idx
+        n_check = min(curr_k, self.max_neighbors_check)
+        if self.screen_top:
+            # The surrogate is cheap enough to score the whole neighborhood
+            n_check = curr_k
+
+        # O(1) membership map over A_full for the CURRENT candidates
+        active = self.active.A_mask
+        if len(candidates_indices) < self.nn_rebuild_fraction * len(self._nn_points):
+            self._build_neighbor_index(np.asarray(candidates_indices))
 
-        nbrs_model = NearestNeighbors(n_neighbors=curr_k).fit(candidate_data)
+        self._set_active_key(candidates_indices, self.current_B_indices)
+        if self.pool is not None:
+            self._drain_pool()
+            self.pool.set_active(candidates_indices, self.current_B_indices)
 
-        # We need to access B to evaluate performance
-        current_B_indices = getattr(self, "current_B_indices", [])
+        # Surrogate score of every candidate seen (screening mode)
+        screened = {}
 
         # Heuristic loop
         for vns_step in range(self.max_vns_iter):
-            try:
-                # Find position in candidates_indices list
-                internal_idx = candidates_indices.index(current_best_idx)
-            except ValueError:
+            if not active[current_best_idx] or self._time_left() <= 0:
                 break
 
-            # Get neighbors (indices in candidate_data)
-            distances, indices = nbrs_model.kneighbors([candidate_data[internal_idx]])
-            neighbor_internal_indices = indices[0]
-
-            # Check neighbors
-            improved = False
-            checked_count = 0
-            for n_int_idx in neighbor_internal_indices:
-                if checked_count >= self.max_neighbors_check:
-                    break
-                checked_count += 1
-
-                n_full_idx = candidates_indices[n_int_idx]
-
-                # Verify if we should test this neighbor (skip if same as current)
-                if n_full_idx == current_best_idx and vns_step > 0:
-                    continue
+            # Get the nearest active neighbors (indices in A_full)
+            neighbor_full_indices = self._active_neighbors(
+                current_best_idx, n_check, active
+            )
 
-                # Solve QP
-                center_candidate = self.A_full[n_full_idx]
+            # Neighbors to check (skip the current center after the first step)
+            neighbor_indices = [
+                n_full_idx
+                for n_full_idx in neighbor_full_indices
+                if not (n_full_idx == current_best_idx and vns_step > 0)
+            ]
 
-                # Solve QP
-                params = solve_subproblem_qk(
-                    candidates_indices,
-                    current_B_indices,
-                    self.A_full,
-                    self.B_full,
-                    center_candidate,
-                    self.C,
-                    self.lamb,
-                )
+            if self.screen_top:
+                candidates = self._surrogate_candidates(neighbor_indices, screened)
+            else:
+                candidates = self._evaluate_candidates(neighbor_indices)
 
-                if params is None:
+            # Check neighbors
+            improved = False
+            for n_full_idx, params, score in candidates:
+                if params is None and not self.screen_top:
                     continue
 
-                # Calculate Efficiency (Cut Volume)
-                g_vals = self._evaluate_g(
-                    self.A_full[candidates_indices],
-                    params["w"],
-                    params["xi"],
-                    params["gamma"],
-                    center_candidate,
-                )
-
-                # Correctly classified A (removed) are those with g(a) <= 0
-                removed_count = np.sum(g_vals <= 0)
-                score = removed_count
-
                 if score > current_best_score:
                     current_best_score = score
                     current_best_idx = n_full_idx
@@ -110,7 +434,9 @@ class VNS_RPCF(RPCF):
 
             if not improved:
                 # Shaking: Jump to a random other candidate
-                idx_rand = np.random.choice(len(candidates_indices))
+                idx_rand = self.rng.choice(len(candidates_indices))
                 current_best_idx = candidates_indices[idx_rand]
 
+        if self.screen_top and screened:
+            return self._pick_screened(screened)
         return current_best_idx
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from src.dataloader import DatasetLoader
+
+
+def _write_csv(path, seed=0):
+    rng = np.random.RandomState(seed)
+    X = rng.normal(size=(60, 4))
+    labels = np.where(X[:, 0] > 0, "g", "b")
+    lines = ["f1,f2,f3,f4,Class"]
+    lines += [",".join([*map(str, row), label]) for row, label in zip(X, labels)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_cached_load_works_warm_and_offline(tmp_path):
+    pytest.importorskip("pandas")
+    cache_dir = str(tmp_path / "cache")
+    _write_csv(tmp_path / "ionosphere.csv")
+    seeder = DatasetLoader(cache_dir=cache_dir)
+    X, y = seeder.seed_from_csv("ionosphere", tmp_path / "ionosphere.csv", "Class")
+
+    for offline in (False, True):
+        loader = DatasetLoader(cache_dir=cache_dir, offline=offline)
+        X_cached, y_cached = loader.load_dataset("ionosphere")
+        assert isinstance(X_cached, np.memmap)
+        assert np.array_equal(X_cached, X)
+        assert np.array_equal(y_cached, y)
+        assert np.array_equal(loader.scaler.mean_, seeder.scaler.mean_)
+        assert np.array_equal(loader.scaler.scale_, seeder.scaler.scale_)
+    assert not [p for p in tmp_path.rglob("*.tmp*")]
+
+    # A dataset that was never cached cannot be loaded offline
+    with pytest.raises(RuntimeError):
+        DatasetLoader(cache_dir=cache_dir, offline=True).load_dataset("heart")
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_moons
+
+from src.solvers import GurobiQkSession, configure, get_environment, solve_stats
+
+
+def test_configure_leaves_live_sessions_working():
+    pytest.importorskip("gurobipy")
+    X, y = make_moons(100, noise=0.3, random_state=0)
+    A, B = np.flatnonzero(y == 0), np.flatnonzero(y == 1)
+    old = configure()
+    session = GurobiQkSession(X, A, B, 10.0, 0.01)
+    first = session.solve(X[A[0]])
+
+    configure(threads=1)
+    assert get_environment().threads == 1
+    assert old._env is not None
+    # The session keeps the old environment; its solves count in the new one
+    assert session.solve(X[A[1]]) is not None
+    assert session.solve(X[A[0]])["obj"] == pytest.approx(first["obj"])
+    assert solve_stats()["solves"] == 2
+    session.dispose()
+    configure()
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_moons
+
+import src.rpcf
+from src.grid_search import regularization_path
+from src.rpcf import RPCF
+
+
+def _data(n_samples=240, seed=0):
+    X, y = make_moons(n_samples, noise=0.3, random_state=seed)
+    return X, np.where(y == 1, 1, -1)
+
+
+@pytest.mark.parametrize("solver", ["gurobi", "native"])
+def test_regularization_path_matches_separate_fits(monkeypatch, solver):
+    if solver == "gurobi":
+        pytest.importorskip("gurobipy")
+    X, y = _data()
+    X_train, y_train, X_val, y_val = X[:180], y[:180], X[180:], y[180:]
+    C_values, lamb_values = [1, 10], [0.01, 0.1]
+
+    built = []
+    make_session = src.rpcf.make_session
+    monkeypatch.setattr(
+        src.rpcf,
+        "make_session",
+        lambda *args, **kwargs: built.append(1) or make_session(*args, **kwargs),
+    )
+    result = regularization_path(
+        X_train, y_train, X_val, y_val, C_values, lamb_values, solver=solver
+    )
+    # One session for the whole path
+    assert len(built) == 1
+
+    center_order = np.random.RandomState(42).permutation(np.flatnonzero(y_train == -1))
+    for row in result["path"]:
+        model = RPCF(C=row["C"], lamb=row["lamb"], solver=solver)
+        model.center_order = center_order
+        model.fit(X_train, y_train)
+        assert row["n_functions"] == len(model.functions)
+        assert row["acc"] == np.mean(model.predict(X_val) == y_val)
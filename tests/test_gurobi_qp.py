@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_moons
+
+from src.solvers.gurobi_qp import GurobiQkSession, solve_subproblem_qk
+
+pytest.importorskip("gurobipy")
+
+
+def _problem(n_samples=180):
+    # Small enough for a size-limited Gurobi license
+    X, y = make_moons(n_samples, noise=0.3, random_state=1)
+    return X, np.flatnonzero(y == 0), np.flatnonzero(y == 1)
+
+
+def test_lazy_b_matches_full_solve():
+    X, A_indices, B_indices = _problem()
+    for center in A_indices[:3]:
+        full = solve_subproblem_qk(
+            A_indices, B_indices, X, X, X[center], 10.0, 0.01, lazy_b=0
+        )
+        lazy = solve_subproblem_qk(
+            A_indices, B_indices, X, X, X[center], 10.0, 0.01, lazy_b=10
+        )
+        assert lazy["obj"] == pytest.approx(full["obj"], rel=1e-6)
+
+
+def test_lazy_b_session_matches_full_session_after_removals():
+    X, A_indices, B_indices = _problem()
+    full = GurobiQkSession(X, A_indices, B_indices, 10.0, 0.01, lazy_b=0)
+    lazy = GurobiQkSession(X, A_indices, B_indices, 10.0, 0.01, lazy_b=10)
+
+    def check(centers):
+        for center in centers:
+            expected = full.solve(X[center])
+            assert lazy.solve(X[center])["obj"] == pytest.approx(
+                expected["obj"], rel=1e-6
+            )
+
+    check(A_indices[[0, 3, 0]])
+    # Removed B points include some that never got a row in the lazy model
+    for session in (full, lazy):
+        session.remove_points(A_indices[:20], B_indices[::4])
+    check(A_indices[[30, 31]])
+    for session in (full, lazy):
+        session.reset(A_indices, B_indices, 1.0, 0.1)
+    check(A_indices[[5]])
+    full.dispose()
+    lazy.dispose()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_moons
+from sklearn.exceptions import NotFittedError
+from sklearn.preprocessing import StandardScaler
+
+from src.rpcf import RPCF
+from src.solvers import SOLVERS
+from src.vns_rpcf import VNS_RPCF
+
+
+def _data(n_samples=160, seed=0):
+    X, y = make_moons(n_samples, noise=0.3, random_state=seed)
+    return X, np.where(y == 1, 1, -1)
+
+
+def _save_rpcf(tmp_path):
+    X, y = _data()
+    model = RPCF(C=10, solver="native")
+    model.rng = np.random.RandomState(0)
+    model.fit(X, y)
+    path = tmp_path / "rpcf.bin"
+    model.save(path)
+    return path
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(tmp_path, mmap):
+    X, y = _data()
+    model = VNS_RPCF(C=10, solver=SOLVERS["native"], n_jobs=np.int64(1))
+    model.rng = np.random.RandomState(0)
+    model.fit(X, y)
+    model.scaler = StandardScaler().fit(X)
+    path = tmp_path / "model.bin"
+    model.save(path)
+
+    loaded = VNS_RPCF.load(path, mmap=mmap)
+    assert isinstance(loaded.functions[0]["w"], np.memmap) == mmap
+    assert loaded.solver == "native"
+    assert loaded.n_jobs == 1
+    assert len(loaded.functions) == len(model.functions)
+    for f, g in zip(model.functions, loaded.functions):
+        assert np.array_equal(f["w"], g["w"])
+        assert np.array_equal(f["center"], g["center"])
+        assert (f["xi"], f["gamma"]) == (g["xi"], g["gamma"])
+    assert np.array_equal(loaded.predict(X), model.predict(X))
+    assert np.array_equal(loaded.scaler.transform(X), model.scaler.transform(X))
+    with pytest.raises(TypeError):
+        VNS_RPCF.load(_save_rpcf(tmp_path))
+
+
+def test_save_rejects_unfitted_scaler(tmp_path):
+    model = RPCF.load(_save_rpcf(tmp_path))
+    model.scaler = StandardScaler()
+    with pytest.raises(NotFittedError):
+        model.save(tmp_path / "model.bin")
@@ -0,0 +1,26 @@
+import numpy as np
+from sklearn.datasets import make_moons
+
+from src.solvers.native_qp import _slack_weights, qk_rows, solve_qk_native
+
+
+def _problem(n_samples=1000):
+    X, y = make_moons(n_samples, noise=0.3, random_state=0)
+    A_indices = np.flatnonzero(y == 1)
+    B_indices = np.flatnonzero(y == 0)
+    G = qk_rows(A_indices, B_indices, X, X, X[A_indices[0]])
+    return G, A_indices, B_indices
+
+
+def test_warm_start_needs_fewer_iterations():
+    G, A_indices, B_indices = _problem()
+    c = _slack_weights(A_indices, B_indices, 0.1)
+    u0, _, _, _ = solve_qk_native(G, c, 0.01)
+
+    # Next lambda of the regularization path, same center
+    _, cold_obj, cold_iter, cold_status = solve_qk_native(G, c, 0.1)
+    _, warm_obj, warm_iter, warm_status = solve_qk_native(G, c, 0.1, u0=u0)
+
+    assert cold_status == warm_status == "optimal"
+    assert warm_iter < cold_iter
+    assert np.isclose(warm_obj, cold_obj, rtol=1e-7)
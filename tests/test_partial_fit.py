@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_moons
+
+from src.rpcf import RPCF
+
+
+def _data(n_samples=240, seed=0):
+    X, y = make_moons(n_samples, noise=0.3, random_state=seed)
+    return X, np.where(y == 1, 1, -1)
+
+
+def _check_training_set(model):
+    # The active set's labels and covering cones agree with the cones
+    X, y, active = model.A_full, model.y_full, model.active
+    g = model._cone_values(X)
+    covered = active.cone_of >= 0
+    assert np.array_equal(g.min(axis=0) <= 0, covered)
+    assert (g[active.cone_of[covered], np.flatnonzero(covered)] <= 0).all()
+    assert np.array_equal(active.predict(), model.predict(X))
+    assert model.train_accuracy == np.mean(model.predict(X) == y)
+
+
+def test_partial_fit_keeps_sample_weights():
+    X, y = _data()
+    weights = np.random.RandomState(0).uniform(0.5, 2.0, 160)
+    model = RPCF(C=10, solver="native")
+    model.rng = np.random.RandomState(0)
+    model.fit(X[:160], y[:160], sample_weight=weights)
+
+    batch_weights = np.full(40, 3.0)
+    model.partial_fit(X[160:200], y[160:200], sample_weight=batch_weights)
+    model.partial_fit(X[200:], y[200:])
+
+    stored = model.active.sample_weight
+    assert len(stored) == len(X)
+    assert np.array_equal(stored[:160], weights)
+    assert np.array_equal(stored[160:200], batch_weights)
+    assert np.array_equal(stored[200:], np.ones(40))
+    _check_training_set(model)
+
+
+def test_partial_fit_covers_points_left_by_early_stop():
+    X, y = _data()
+    model = RPCF(C=10, solver="native", max_functions=1)
+    model.rng = np.random.RandomState(0)
+    model.fit(X, y)
+    assert model.stop_reason == "max_functions"
+    left = model.active.A_indices
+    assert len(left) > 0
+
+    # A batch of B points far from the data adds nothing to cover itself
+    model.max_functions = None
+    model.partial_fit(X[y == 1][:5] + 100.0, np.ones(5, dtype=int))
+
+    assert model.stop_reason == "converged"
+    assert (model.predict(X[left]) == -1).all()
+    _check_training_set(model)
+
+
+def test_refit_then_partial_fit():
+    X, y = _data()
+    model = RPCF(C=10, solver="native")
+    model.rng = np.random.RandomState(0)
+    model.fit(X[:120], y[:120])
+    model.fit(X[:200], y[:200])
+    assert model.active.n_cones == len(model.functions)
+    _check_training_set(model)
+
+    model.partial_fit(X[200:], y[200:])
+    assert model.active.n_cones == len(model.functions)
+    _check_training_set(model)
+
+
+def test_compact_on_new_points_then_partial_fit():
+    X, y = _data()
+    model = RPCF(C=10, solver="native")
+    model.rng = np.random.RandomState(0)
+    model.fit(X[:160], y[:160])
+    model.compact(X[160:200], y[160:200], min_gain=2)
+    assert model.active.n_cones == len(model.functions)
+    _check_training_set(model)
+
+    model.partial_fit(X[200:], y[200:])
+    _check_training_set(model)
+
+    model.active.n_cones += 1
+    with pytest.raises(ValueError):
+        model.partial_fit(X[:5], y[:5])
@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.predictor import INDEX_MIN_CONES, SCAN_CONES, ConePredictor
+
+
+def _functions(n_cones, n_features=3, seed=0):
+    rng = np.random.RandomState(seed)
+    functions = []
+    for k in range(n_cones):
+        w = rng.uniform(-1, 1, n_features)
+        # Every fortieth cone is unbounded (xi = ||w||_inf) and always scanned
+        xi = np.abs(w).max() + (0.0 if k % 40 == 0 else 0.2 + rng.rand())
+        functions.append(
+            {
+                "w": w,
+                "xi": xi,
+                "gamma": rng.uniform(0.0, 1.0),
+                "center": rng.uniform(-3, 3, n_features),
+            }
+        )
+    return functions
+
+
+def test_index_predicts_like_a_full_scan():
+    functions = _functions(10 * (SCAN_CONES + INDEX_MIN_CONES))
+    X = np.random.RandomState(1).uniform(-4, 4, (3000, 3))
+
+    indexed = ConePredictor(functions, chunk_size=512)
+    assert indexed.index is not None
+
+    g = np.array(
+        [
+            X @ f["w"]
+            - f["w"] @ f["center"]
+            + f["xi"] * np.abs(X - f["center"]).sum(axis=1)
+            - f["gamma"]
+            for f in functions
+        ]
+    )
+    expected = np.where(g.min(axis=0) <= 0, -1, 1)
+    # Both labels occur, so the test is not passing on a constant
+    assert 0 < np.count_nonzero(expected == -1) < len(X)
+    np.testing.assert_array_equal(indexed.predict(X), expected)
+    scanned = ConePredictor(functions, chunk_size=512, use_index=False)
+    np.testing.assert_array_equal(scanned.predict(X), expected)
+    np.testing.assert_allclose(indexed.decision_function(X), g.min(axis=0))
@@ -0,0 +1,44 @@
+import numpy as np
+from sklearn.datasets import make_moons
+
+from src.rpcf import RPCF
+
+
+def _data(n_samples=240, seed=0):
+    X, y = make_moons(n_samples, noise=0.3, random_state=seed)
+    return X, np.where(y == 1, 1, -1)
+
+
+def test_min_removed_is_capped_by_points_left():
+    X, y = _data()
+    model = RPCF(C=10, solver="native", min_removed=3)
+    model.rng = np.random.RandomState(0)
+    model.fit(X, y)
+    # The last A point is covered although no cone can remove 3 of them
+    assert model.stop_reason == "converged"
+    assert len(model.active.A_indices) == 0
+
+
+def test_resumed_fit_matches_uninterrupted(tmp_path):
+    X, y = _data(160)
+    full = RPCF(C=10, solver="native")
+    full.rng = np.random.RandomState(1)
+    full.fit(X, y)
+
+    checkpoint = str(tmp_path / "fit.ckpt")
+    stopped = RPCF(C=10, solver="native", max_functions=3)
+    stopped.rng = np.random.RandomState(1)
+    stopped.fit(X, y, checkpoint_path=checkpoint)
+    assert stopped.stop_reason == "max_functions"
+
+    # The checkpoint carries the generator state, so the seed here is unused
+    resumed = RPCF(C=10, solver="native")
+    resumed.rng = np.random.RandomState(99)
+    resumed.fit(X, y, resume_from=checkpoint)
+
+    assert len(full.functions) > 3
+    assert len(resumed.functions) == len(full.functions)
+    for a, b in zip(full.functions, resumed.functions):
+        np.testing.assert_allclose(a["center"], b["center"])
+        np.testing.assert_allclose(a["obj"], b["obj"], rtol=1e-9)
+    np.testing.assert_array_equal(full.predict(X), resumed.predict(X))
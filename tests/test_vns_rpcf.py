@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_moons
+
+from src.vns_rpcf import VNS_RPCF
+
+
+def _data(n_samples=160, seed=0):
+    X, y = make_moons(n_samples, noise=0.3, random_state=seed)
+    return X, np.where(y == 1, 1, -1)
+
+
+def test_small_fit_warns_that_n_jobs_is_ignored():
+    X, y = _data()
+    model = VNS_RPCF(C=10, solver="native", n_jobs=2)
+    model.rng = np.random.RandomState(0)
+    with pytest.warns(RuntimeWarning, match="n_jobs is ignored"):
+        model.fit(X, y)
+    assert model.pool is None
+
+
+@pytest.mark.parametrize("screen_top", [1, 3])
+def test_screening_cuts_qp_solves(screen_top):
+    X, y = _data(400)
+    plain = VNS_RPCF(C=10, solver="native")
+    plain.rng = np.random.RandomState(0)
+    plain.fit(X, y)
+
+    screened = VNS_RPCF(C=10, solver="native", screen_top=screen_top)
+    screened.rng = np.random.RandomState(0)
+    screened.fit(X, y)
+
+    solves = screened.qp_solves
+    # One exact solve per cone attempt, and no inexact ones for screen_top=1
+    assert solves["exact"] <= len(screened.functions) + 2
+    if screen_top == 1:
+        assert solves["inexact"] == 0
+    assert solves["inexact"] <= screen_top * solves["exact"]
+    assert sum(solves.values()) * 2 < plain.qp_solves["exact"]
+    assert screened.train_accuracy > 0.8